@@ -1,3 +1,5 @@
+import heapq
+
 import numpy as np
 import pandas as pd
 
@@ -6,7 +8,7 @@ from config import settings as cfg
 # from models.registry import generate_signals
 
 
-def backtest_hedging(df, signals, conf,
+def backtest_hedging_loop(df, signals, conf,
                      sl_mult=cfg.SL_MULT,
                      tp_mult=cfg.TP_MULT,
                      initial_balance=cfg.INITIAL_BALANCE,
@@ -14,6 +16,7 @@ def backtest_hedging(df, signals, conf,
                      conf_threshold=cfg.CONF_THRESHOLD,
                      atr_norm_threshold=cfg.ATR_NORM_THRESHOLD,
                      contr_size=1, lev=20, marg_limit=0.5):
+    """Bar-by-bar reference implementation of backtest_hedging."""
 
     balance = initial_balance
     equity_curve = []
@@ -111,3 +114,231 @@ def backtest_hedging(df, signals, conf,
     trades_df = pd.DataFrame(trade_log)
     return balance, equity_df, trades_df
 
+
+
+# largest (entries, bars) block scanned at once when searching for exits
+EXIT_SCAN_CELLS = 4_000_000
+# bars after entry scanned for every candidate up front; longer holds are resolved
+# only for trades that actually open
+EXIT_SCAN_BARS = 256
+EXIT_PENDING = -1
+
+
+def find_exits(entry_index, long, tp, sl, highs, lows, first_bar=1, max_bars=None):
+    """
+    First bar after each entry whose high/low reaches the entry's TP or SL.
+
+    Scans bars entry + first_bar .. entry + max_bars. Returns (exit_index,
+    hit_tp); exit_index is len(highs) for trades that never exit and
+    EXIT_PENDING for trades still open after max_bars. hit_tp is True when
+    the exit bar reaches TP (TP wins when a bar reaches both, like the loop).
+    Bars are scanned in blocks that double in length, restricted to entries
+    still open, so the common quick exits cost one bar each and long holds
+    only a few passes.
+    """
+    n = len(highs)
+    last = n if max_bars is None else max_bars + 1
+    upper = np.where(long, tp, sl)
+    lower = np.where(long, sl, tp)
+    exit_index = np.full(len(entry_index), n)
+    hit_tp = np.zeros(len(entry_index), dtype=bool)
+    active = np.arange(len(entry_index))
+    offset, block = first_bar, 1
+
+    while len(active) and offset < min(n, last):
+        block = max(1, min(block, EXIT_SCAN_CELLS // len(active), last - offset))
+        entries = entry_index[active]
+        bars = entries[:, None] + np.arange(offset, offset + block)
+        inside = bars < n
+        bars = np.minimum(bars, n - 1)
+        upper_hit = highs[bars] >= upper[active][:, None]
+        lower_hit = lows[bars] <= lower[active][:, None]
+        hit = (upper_hit | lower_hit) & inside
+
+        done = hit.any(axis=1)
+        rows = active[done]
+        first = hit[done].argmax(axis=1)
+        exit_index[rows] = bars[done, first]
+        hit_tp[rows] = np.where(long[rows], upper_hit[done, first], lower_hit[done, first])
+
+        offset += block
+        active = active[~done & (entries + offset < n)]
+        block *= 2
+
+    exit_index[active] = EXIT_PENDING
+    return exit_index, hit_tp
+
+
+def _settle(long, entry_price, tp, sl, hit_tp, position_size):
+    """exit_price, pnl_points, pnl with the loop's arithmetic."""
+    exit_price = np.where(hit_tp, tp, sl)
+    pnl_points = np.where(long, exit_price - entry_price, entry_price - exit_price)
+    return exit_price, pnl_points, pnl_points * position_size
+
+
+class EntryBook:
+    """
+    Arrays shared by every backtest of one signal series.
+
+    Holds the entry candidates (bars with a signal and ATR that pass the
+    given, loosest, thresholds) with their margins, and caches their exits
+    per (sl_mult, tp_mult). A trade's exit depends only on its entry bar, so
+    exits are found vectorized for all candidates at once, up to
+    EXIT_SCAN_BARS ahead; longer holds are searched in simulate() for the
+    trades that actually open.
+    """
+
+    def __init__(self, df, signals, conf, position_size=cfg.POSITION_SIZE, contr_size=1, lev=20,
+                 conf_threshold=cfg.CONF_THRESHOLD, atr_norm_threshold=cfg.ATR_NORM_THRESHOLD):
+        self.index = df.index
+        self.highs = df["high"].values
+        self.lows = df["low"].values
+        self.atr = df["atr"].values
+        self.atr_norm = (df["atr"] / df["close"]).values
+        self.signals = np.asarray(signals)
+        self.conf = np.asarray(conf)
+        self.position_size = position_size
+        self.n = len(df)
+
+        self.entries = np.flatnonzero(self.eligible(conf_threshold, atr_norm_threshold)
+                                      & (self.signals != 0) & (self.atr > 0))
+        self.entry_price = df["close"].values[self.entries]
+        self.entry_atr = self.atr[self.entries]
+        self.long = self.signals[self.entries] == 1
+        self.margin = (self.entry_price * position_size * contr_size) / lev
+        self._exits = {}
+
+    def eligible(self, conf_threshold, atr_norm_threshold):
+        """Bars that reach the entry logic (bar 0 never does); NaN passes like in the loop."""
+        eligible = ~(self.atr_norm < atr_norm_threshold) & ~(self.conf < conf_threshold)
+        eligible[:1] = False
+        return eligible
+
+    def exits(self, sl_mult, tp_mult):
+        """dict of tp, sl, exit_index, hit_tp, pnl per candidate for one barrier pair."""
+        key = (sl_mult, tp_mult)
+        if key not in self._exits:
+            price, atr, long = self.entry_price, self.entry_atr, self.long
+            tp = np.where(long, price + tp_mult * atr, price - tp_mult * atr)
+            sl = np.where(long, price - sl_mult * atr, price + sl_mult * atr)
+            exit_index, hit_tp = find_exits(self.entries, long, tp, sl, self.highs, self.lows,
+                                            max_bars=EXIT_SCAN_BARS)
+            pnl = _settle(long, price, tp, sl, hit_tp, self.position_size)[2]
+            self._exits[key] = {"tp": tp, "sl": sl, "exit_index": exit_index, "hit_tp": hit_tp, "pnl": pnl}
+        return self._exits[key]
+
+    def _resolve(self, ex, k):
+        # exit of a trade held longer than the up-front scan
+        one = slice(k, k + 1)
+        ex["exit_index"][one], ex["hit_tp"][one] = find_exits(
+            self.entries[one], self.long[one], ex["tp"][one], ex["sl"][one], self.highs, self.lows,
+            first_bar=EXIT_SCAN_BARS + 1)
+        ex["pnl"][one] = _settle(self.long[one], self.entry_price[one], ex["tp"][one], ex["sl"][one],
+                                 ex["hit_tp"][one], self.position_size)[2]
+
+    def simulate(self, sl_mult, tp_mult, initial_balance, marg_limit, candidates=None):
+        """
+        Margin-checked pass over the candidates (positions into self.entries,
+        default all). Earlier exits are applied from a heap in the loop's
+        order (exit bar, then entry bar), so balance and used margin follow
+        the loop's exact float operations.
+
+        Returns (closed, blocked, balances): candidate positions of the trades
+        that closed, in closing order, the bars whose entry was margin-blocked,
+        and the balance before and after each closed trade.
+        """
+        ex = self.exits(sl_mult, tp_mult)
+        n = self.n
+        exit_list, pnl_list, margin_list = ex["exit_index"].tolist(), ex["pnl"].tolist(), self.margin.tolist()
+        if candidates is None:
+            candidates = np.arange(len(self.entries))
+        heappush, heappop = heapq.heappush, heapq.heappop
+
+        balance = initial_balance
+        used_margin = 0
+        pending = []
+        blocked = []
+        closed = []
+        next_exit = n
+
+        for k, i in zip(candidates.tolist(), self.entries[candidates].tolist()):
+            while next_exit <= i:
+                j = heappop(pending)[1]
+                balance += pnl_list[j]
+                used_margin -= margin_list[j]
+                closed.append(j)
+                next_exit = pending[0][0] if pending else n
+            trade_margin = margin_list[k]
+            if used_margin + trade_margin > balance * marg_limit:
+                blocked.append(i)
+                continue
+            used_margin += trade_margin
+            if exit_list[k] == EXIT_PENDING:
+                self._resolve(ex, k)
+                exit_list[k], pnl_list[k] = int(ex["exit_index"][k]), float(ex["pnl"][k])
+            heappush(pending, (exit_list[k], k))
+            next_exit = pending[0][0]
+        closed += [j for exit_bar, j in sorted(pending) if exit_bar < n]
+        closed = np.array(closed, dtype=np.int64)
+
+        # same summation order as the loop
+        balances = np.array([initial_balance])
+        if len(closed):
+            balances = np.cumsum(np.concatenate([balances, ex["pnl"][closed]]))
+        return closed, blocked, balances
+
+    def equity(self, eligible, blocked, closed, balances, sl_mult, tp_mult):
+        """(equity bars, values): balance at every eligible bar that was not margin-blocked."""
+        eligible = eligible.copy()
+        eligible[blocked] = False
+        bars = np.flatnonzero(eligible)
+        exit_index = self.exits(sl_mult, tp_mult)["exit_index"]
+        return bars, balances[np.searchsorted(exit_index[closed], bars, side="right")]
+
+
+def backtest_hedging(df, signals, conf,
+                     sl_mult=cfg.SL_MULT,
+                     tp_mult=cfg.TP_MULT,
+                     initial_balance=cfg.INITIAL_BALANCE,
+                     position_size=cfg.POSITION_SIZE,
+                     conf_threshold=cfg.CONF_THRESHOLD,
+                     atr_norm_threshold=cfg.ATR_NORM_THRESHOLD,
+                     contr_size=1, lev=20, marg_limit=0.5):
+    """
+    Same results as backtest_hedging_loop, computed on arrays (see EntryBook):
+    exits are found vectorized, only the margin check loops, over entry
+    candidates rather than bars, and the equity curve is read off the
+    balance after each exit.
+    """
+    book = EntryBook(df, signals, conf, position_size, contr_size, lev, conf_threshold, atr_norm_threshold)
+    closed, blocked, balances = book.simulate(sl_mult, tp_mult, initial_balance, marg_limit)
+
+    eligible = book.eligible(conf_threshold, atr_norm_threshold)
+    bars, equity = book.equity(eligible, blocked, closed, balances, sl_mult, tp_mult)
+    equity_df = pd.DataFrame({"equity": equity}, index=book.index[bars].rename("time"))
+
+    if not len(closed):
+        return initial_balance, equity_df, pd.DataFrame([])
+    ex = book.exits(sl_mult, tp_mult)
+    exit_price, pnl_points, pnl = _settle(book.long, book.entry_price, ex["tp"], ex["sl"], ex["hit_tp"],
+                                          position_size)
+    t = closed
+    e = book.entries[t]
+    exit_index = ex["exit_index"][t]
+    trades_df = pd.DataFrame({
+        "entry_time": book.index[e],
+        "entry_index": e,
+        "entry_price": book.entry_price[t],
+        "direction": book.signals[e],
+        "size": np.full(len(t), position_size),
+        "atr": book.entry_atr[t],
+        "confidence": book.conf[e],
+        "atr_norm": book.atr_norm[e],
+        "margin": book.margin[t],
+        "exit_time": book.index[exit_index],
+        "exit_price": exit_price[t],
+        "pnl": pnl[t],
+        "pnl_points": pnl_points[t],
+        "holding_bars": exit_index - e,
+    })
+    return balances[-1], equity_df, trades_df
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from config import settings as cfg
+from backtesting.engine import EntryBook
+from backtesting.metrics import sharpe_ratio
+
+# execution parameters a grid can vary, with backtest_hedging's defaults
+GRID_DEFAULTS = {
+    "sl_mult": cfg.SL_MULT,
+    "tp_mult": cfg.TP_MULT,
+    "conf_threshold": cfg.CONF_THRESHOLD,
+    "atr_norm_threshold": cfg.ATR_NORM_THRESHOLD,
+    "marg_limit": 0.5,
+}
+
+
+def backtest_grid(df, signals, conf, param_sets,
+                  initial_balance=cfg.INITIAL_BALANCE,
+                  position_size=cfg.POSITION_SIZE,
+                  contr_size=1, lev=20, return_equity=False):
+    """
+    Backtest one signal series under K execution parameter sets.
+
+    param_sets is a list of dicts (or a DataFrame) with any of GRID_DEFAULTS'
+    keys. Entry candidates and margins are computed once, exits once per
+    distinct (sl_mult, tp_mult); each set then only runs the margin-checked
+    pass over its candidates. Per-set results equal backtest_hedging's.
+
+    Returns a DataFrame with one row per set: its parameters plus
+    final_balance, pnl, sharpe, n_trades and n_blocked. With return_equity,
+    returns (results, equity_dfs) where equity_dfs[k] is set k's equity_df.
+    """
+    sets = pd.DataFrame(list(param_sets) if not isinstance(param_sets, pd.DataFrame) else param_sets)
+    for name, default in GRID_DEFAULTS.items():
+        # also sets that leave out a key another set has
+        sets[name] = sets[name].fillna(default) if name in sets else default
+    sets = sets.reset_index(drop=True)
+
+    book = EntryBook(df, signals, conf, position_size, contr_size, lev,
+                     conf_threshold=sets["conf_threshold"].min(),
+                     atr_norm_threshold=sets["atr_norm_threshold"].min())
+
+    rows = []
+    curves = []
+    for params in sets.to_dict("records"):
+        sl_mult, tp_mult = params["sl_mult"], params["tp_mult"]
+        eligible = book.eligible(params["conf_threshold"], params["atr_norm_threshold"])
+        candidates = np.flatnonzero(eligible[book.entries])
+        closed, blocked, balances = book.simulate(sl_mult, tp_mult, initial_balance,
+                                                  params["marg_limit"], candidates)
+        bars, equity = book.equity(eligible, blocked, closed, balances, sl_mult, tp_mult)
+
+        final_balance = balances[-1] if len(closed) else initial_balance
+        rows.append({
+            **params,
+            "final_balance": final_balance,
+            "pnl": final_balance - initial_balance,
+            "sharpe": sharpe_ratio(equity),
+            "n_trades": len(closed),
+            "n_blocked": len(blocked),
+        })
+        if return_equity:
+            curves.append(pd.DataFrame({"equity": equity}, index=book.index[bars].rename("time")))
+
+    results = pd.DataFrame(rows)
+    if return_equity:
+        return results, curves
+    return results
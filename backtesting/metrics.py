@@ -0,0 +1,26 @@
+import numpy as np
+
+from config import settings as cfg
+from utils.timeframes import TIMEFRAME_MINUTES
+
+
+def periods_per_year(timeframe: str = cfg.TIMEFRAME, trading_days: int = 252) -> int:
+    return 1440 // TIMEFRAME_MINUTES[timeframe] * trading_days
+
+
+def sharpe_ratio(equity, periods: int = None) -> float:
+    """Annualized Sharpe of bar-to-bar equity returns; 0 when flat or under 10 returns."""
+    periods = periods or periods_per_year()
+    equity = np.asarray(equity, dtype=np.float64)
+    if len(equity) < 2:
+        return 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = equity[1:] / equity[:-1] - 1
+    ret = ret[~np.isnan(ret)]
+
+    if len(ret) < 10:
+        return 0.0
+    std = ret.std(ddof=1)
+    if std == 0:
+        return 0.0
+    return float((ret.mean() / std) * np.sqrt(periods))
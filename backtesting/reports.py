@@ -3,9 +3,7 @@ matplotlib.use("TkAgg")
 import matplotlib.pyplot as plt
 from config import settings as cfg
 from backtesting.engine import backtest_hedging
-from live.mt5_client import get_mt5_rates
 from models.registry import generate_signals
-import MetaTrader5 as mt5
 import pandas as pd
 
 
@@ -14,7 +12,7 @@ def run_backtest(model, df_raw, feature_cols):
     df_test = df_raw.loc[cfg.TEST_START : cfg.TEST_END].copy()
 
     # Generate signals on test data
-    df_feat, signals, conf = generate_signals(model, df_test, feature_cols)
+    df_feat, signals, conf = generate_signals(model, df_test, feature_cols, use_cache=True)
 
     # Run backtest
     final_balance, equity_df, trades_df = backtest_hedging(
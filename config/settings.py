@@ -4,11 +4,22 @@ SYMBOL = "[SP500]"
 TIMEFRAME = "M5"
 
 HORIZON = 12  # bars ahead for target
+TARGET_TYPE = "direction"  # "direction" = sign of the return after HORIZON bars, "triple_barrier" = SL/TP barrier outcome
+HORIZON_RANGE = (6, 24)  # horizons searched by the optimizer (inclusive), labeled in one pass
 TRAIN_START = "2025-06-01"
 TRAIN_END = "2025-12-31"
 TEST_START = "2026-01-01"
 TEST_END = "2026-01-28"
 VALIDATION_RATIO = 0.2
+CV_FOLDS = 1  # purged k-fold splits for train_model's report and the optimizer objective, 1 = single time-ordered split
+CV_EMBARGO_MULT = 1.0  # rows dropped after each test block, as a multiple of the label horizon
+CV_WORKERS = 1  # folds evaluated concurrently; XGBoost threads are split between them
+WALK_FORWARD_START = "2025-06-01"  # history covered by the walk-forward run
+WALK_FORWARD_END = "2026-01-28"
+WALK_FORWARD_TRAIN_DAYS = 120  # rolling training window per fold
+WALK_FORWARD_TEST_DAYS = 30  # out-of-sample window per fold
+WALK_FORWARD_STEP_DAYS = None  # fold offset, default WALK_FORWARD_TEST_DAYS (back-to-back test windows)
+WALK_FORWARD_WORKERS = 1  # fold processes; XGBoost threads are split between them
 LOCAL_TZ = "Europe/Sofia"
 
 SL_MULT = 1.5
@@ -22,7 +33,17 @@ ATR_NORM_THRESHOLD = 0.0002
 
 MODEL_TYPE = "xgb"  # future: "lgbm", "rf"
 BEST_PARAMS_PATH = "config/best_params.py"  # or json later
+MODEL_REGISTRY_DIR = "models/saved"  # versioned models per symbol/timeframe, see models/model_store.py
+COMPILED_PREDICTOR = False  # live: walk the trees as flat NumPy arrays instead of calling XGBoost per bar
 OPTIMIZATION_TRIALS = 100
+OPTIMIZATION_WORKERS = 1  # trial processes; XGBoost threads are split between them
+OPTIMIZATION_STORAGE = "data/optuna/journal.log"  # journal file, "sqlite:///..." URL, or "" for in-memory
+OPTIMIZATION_STUDY = None  # study name, default "<symbol>_<timeframe>_<mode>_<settings hash>"; reusing it resumes the study
+OPTIMIZATION_PRUNER = "median"  # "median" or "none"
+EARLY_STOPPING_ROUNDS = 50  # stop boosting when validation mlogloss has not improved for this many rounds
+PRUNE_CHECKPOINT = 25  # boosting rounds between validation-loss reports to the pruner
+PRUNE_PARTIAL_FRACTION = 0.5  # share of the validation window backtested before the pruner is asked again
+OPTIMIZATION_MODE = "joint"  # "joint" = one study over all params, "nested" = train per model config, sweep execution params on its predictions
 MARGIN_LIMIT = 0.7
 LEVARAGE = 20
 
@@ -41,6 +62,24 @@ BASELINE_HORIZON = 12
 MAX_SLIPPAGE = 10
 MAGIC_NUMBER = 12345
 
+BAR_STORE_DIR = "data/bars"  # local per-symbol/timeframe bar cache
+BAR_SOURCE = "mt5"  # "mt5" = live terminal, "replay" = bars saved in BAR_STORE_DIR
+REPLAY_SPEED = 0  # replay speed as a multiple of real time, 0 = no waiting
+LIVE_POLL_MIN = 0.05  # seconds between newest-bar polls right after a bar boundary
+LIVE_POLL_MAX = 1.0  # polling backs off (doubling) up to this while the broker's bar is late
+LATENCY_METRICS = True  # per-stage timings of the live loop
+LATENCY_METRICS_PATH = "logs/latency_metrics.json"
+LATENCY_METRICS_EVERY = 12  # bars between metrics file writes
+LOG_QUEUE_SIZE = 10000  # events buffered for the CSV writer thread; beyond this they are dropped, never blocking
+LOG_BATCH = 256  # events written per batch
+EVENT_STORE = True  # mirror live CSV events into the SQLite event store
+EVENT_STORE_PATH = "logs/events.db"
+
+FEATURE_CACHE_DIR = "data/cache/features"
+FEATURE_CACHE_MAX_MB = 512  # least recently used entries are evicted beyond this
+SIGNAL_CACHE_DIR = "data/cache/signals"  # predictions per model and bar window, dropped when the model is retired
+FEATURE_WARMUP_MULT = 5  # recursive (EMA/Wilder) features get this many times their warm-up in live lookbacks
+
 HYSTORY_START = '2026-02-02'
 HYSTORY_END = '2026-02-06'
 
@@ -1,11 +1,12 @@
 # execution/broker.py
 
-import MetaTrader5 as mt5
 from config import settings as cfg
+from execution.terminal import terminal
 from utils.logging import log_event, log_csv, closed_trades_log_csv
 
 
 def open_position(symbol, direction, volume, sl_distance, tp_distance, conf):
+    mt5 = terminal()
     # direction: 1 = long, -1 = short
     tick = mt5.symbol_info_tick(symbol)
     if tick is None:
@@ -40,6 +41,7 @@ def check_reverse_exit(position, new_signal, current_price):
     new_signal: "LONG", "SHORT", or None
     current_price: float
     """
+    mt5 = terminal()
 
     if new_signal is None:
         return False
@@ -71,6 +73,7 @@ def check_reverse_exit(position, new_signal, current_price):
 
 
 def check_open_positions(signal, last_idx):
+    mt5 = terminal()
     positions = mt5.positions_get(symbol=cfg.SYMBOL)
     last_price = mt5.symbol_info_tick(cfg.SYMBOL).last
 
@@ -87,6 +90,7 @@ def check_open_positions(signal, last_idx):
 
 
 def close_position(position, comment="CLOSE"):
+    mt5 = terminal()
     symbol = position.symbol
     volume = position.volume
     ticket = position.ticket
@@ -1,4 +1,4 @@
-import MetaTrader5 as mt5
+from execution.terminal import terminal
 
 # from utils.logging import log_event
 
@@ -7,6 +7,7 @@ def compute_required_margin(symbol, direction: int, volume: float):
     """
     direction: 1 = long, -1 = short
     """
+    mt5 = terminal()
     symbol_info = mt5.symbol_info(symbol)
     if symbol_info is None:
         return None
@@ -19,6 +20,7 @@ def compute_required_margin(symbol, direction: int, volume: float):
 
 
 def margin_allowed(required_margin: float, direction: int, margin_limit: float) -> bool:
+    mt5 = terminal()
     account_info = mt5.account_info()
     if account_info is None:
         return False
@@ -47,11 +49,13 @@ def margin_allowed(required_margin: float, direction: int, margin_limit: float)
 
 
 def get_position_margin(p):
+    mt5 = terminal()
     order_type = mt5.ORDER_TYPE_BUY if p.type == mt5.ORDER_TYPE_BUY else mt5.ORDER_TYPE_SELL
     return mt5.order_calc_margin(order_type, p.symbol, p.volume, p.price_open)
 
 
 def get_long_short_margin():
+    mt5 = terminal()
     positions = mt5.positions_get()
     long_used = 0.0
     short_used = 0.0
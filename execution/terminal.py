@@ -0,0 +1,128 @@
+# execution/terminal.py
+
+import itertools
+from types import SimpleNamespace
+
+from config import settings as cfg
+
+_paper = None
+
+
+def terminal():
+    """The MetaTrader5 module, or the paper terminal installed by use_paper()."""
+    if _paper is not None:
+        return _paper
+    import MetaTrader5 as mt5
+    return mt5
+
+
+def use_paper(source, symbol: str = cfg.SYMBOL, timeframe: str = cfg.TIMEFRAME):
+    """Route the broker / margin / logging calls to a PaperTerminal on source's bars."""
+    global _paper
+    _paper = PaperTerminal(source, symbol, timeframe)
+    return _paper
+
+
+class PaperTerminal:
+    """
+    The part of the MetaTrader5 API the execution code uses, simulated on a
+    bar source (replay runs need no terminal).
+
+    Prices are the close of the source's newest bar (no spread). Every order
+    opens its own position (hedging account); before every call the
+    newest bar's high/low settles positions whose SL or TP it reaches (SL
+    first when both are), the way backtest_hedging does. Margin is
+    volume * price / LEVARAGE with a contract size of 1, as in the backtests.
+    """
+
+    ORDER_TYPE_BUY = 0
+    ORDER_TYPE_SELL = 1
+    TRADE_ACTION_DEAL = 1
+    ORDER_FILLING_FOK = 0
+    TRADE_RETCODE_DONE = 10009
+    TRADE_RETCODE_INVALID = 10013
+
+    def __init__(self, source, symbol: str = cfg.SYMBOL, timeframe: str = cfg.TIMEFRAME,
+                 balance: float = cfg.INITIAL_BALANCE, leverage: float = cfg.LEVARAGE):
+        self.source = source
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.balance = float(balance)
+        self.leverage = leverage
+        self.positions = {}
+        self._tickets = itertools.count(1)
+        self._bar = None
+
+    # --- prices ---
+
+    def _mark(self):
+        """Price of the newest bar; settles SL/TP on bars after each position's entry bar."""
+        bar = self.source.get_bars(self.symbol, self.timeframe, n=1).iloc[-1]
+        if self._bar is None or bar.name != self._bar.name:
+            self._bar = bar
+            for ticket, p in list(self.positions.items()):
+                if bar.name <= p.bar_time:
+                    continue
+                long = p.type == self.ORDER_TYPE_BUY
+                if p.sl and (bar["low"] <= p.sl if long else bar["high"] >= p.sl):
+                    self._close(ticket, p.sl)
+                elif p.tp and (bar["high"] >= p.tp if long else bar["low"] <= p.tp):
+                    self._close(ticket, p.tp)
+        price = float(self._bar["close"])
+        for p in self.positions.values():
+            p.price_current = price
+            p.profit = self._profit(p, price)
+        return price
+
+    @staticmethod
+    def _profit(p, price: float) -> float:
+        sign = 1 if p.type == PaperTerminal.ORDER_TYPE_BUY else -1
+        return sign * (price - p.price_open) * p.volume
+
+    def symbol_info_tick(self, symbol):
+        price = self._mark()
+        return SimpleNamespace(bid=price, ask=price, last=price, time=int(self._bar.name.timestamp()))
+
+    def symbol_info(self, symbol):
+        price = self._mark()
+        return SimpleNamespace(name=symbol, bid=price, ask=price)
+
+    # --- account ---
+
+    def order_calc_margin(self, order_type, symbol, volume, price):
+        return volume * price / self.leverage
+
+    def account_info(self):
+        self._mark()
+        equity = self.balance + sum(p.profit for p in self.positions.values())
+        margin = sum(self.order_calc_margin(p.type, p.symbol, p.volume, p.price_open)
+                     for p in self.positions.values())
+        return SimpleNamespace(balance=self.balance, equity=equity, margin=margin, margin_free=equity - margin,
+                               margin_level=equity / margin * 100 if margin else 0.0)
+
+    def positions_get(self, symbol=None):
+        self._mark()
+        return tuple(p for p in self.positions.values() if symbol is None or p.symbol == symbol)
+
+    # --- orders ---
+
+    def _close(self, ticket: int, price: float):
+        p = self.positions.pop(ticket)
+        self.balance += self._profit(p, price)
+
+    def order_send(self, request: dict):
+        self._mark()
+        ticket = request.get("position")
+        if ticket is not None:
+            if ticket not in self.positions:
+                return SimpleNamespace(retcode=self.TRADE_RETCODE_INVALID, order=0)
+            self._close(ticket, request["price"])
+            return SimpleNamespace(retcode=self.TRADE_RETCODE_DONE, order=ticket)
+
+        ticket = next(self._tickets)
+        self.positions[ticket] = SimpleNamespace(
+            ticket=ticket, symbol=request["symbol"], type=request["type"], volume=request["volume"],
+            price_open=request["price"], price_current=request["price"], sl=request.get("sl", 0.0),
+            tp=request.get("tp", 0.0), profit=0.0, comment=request.get("comment", ""), bar_time=self._bar.name,
+        )
+        return SimpleNamespace(retcode=self.TRADE_RETCODE_DONE, order=ticket)
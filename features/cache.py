@@ -0,0 +1,88 @@
+# features/cache.py
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from config import settings as cfg
+
+
+def frame_key(df: pd.DataFrame, *parts) -> str:
+    """Content hash of a bar frame (index, columns, values) plus extra key parts."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(df.index.asi8).tobytes())
+    h.update(str(df.index.tz).encode())
+    h.update("|".join(map(str, df.columns)).encode())
+    h.update(np.ascontiguousarray(df.to_numpy(dtype=np.float64)).tobytes())
+    for part in parts:
+        h.update(str(part).encode())
+    return h.hexdigest()
+
+
+class FeatureCache:
+    """
+    On-disk cache of feature frames keyed by frame_key().
+
+    Entries are pickled frames under cfg.FEATURE_CACHE_DIR; a hit refreshes
+    the file's mtime and put() evicts least recently used entries once the
+    directory grows beyond max_mb.
+    """
+
+    def __init__(self, root: str = cfg.FEATURE_CACHE_DIR, max_mb: float = cfg.FEATURE_CACHE_MAX_MB):
+        self.root = root
+        self.max_bytes = int(max_mb * 1024 * 1024)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.pkl")
+
+    def get(self, key: str):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            df = pd.read_pickle(path)
+        except FileNotFoundError:
+            # evicted by another process in between
+            return None
+        except Exception:
+            # unreadable entry (e.g. written by another pandas version)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return df
+
+    def put(self, key: str, df: pd.DataFrame):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self._path(key) + ".tmp"
+        df.to_pickle(tmp)
+        os.replace(tmp, self._path(key))
+        self.evict()
+
+    def evict(self):
+        # optimizer workers share the directory: an entry can vanish between
+        # listdir, stat and remove when another process evicts at the same time
+        entries = []
+        for name in os.listdir(self.root):
+            if name.endswith(".pkl"):
+                try:
+                    stat = os.stat(os.path.join(self.root, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.root, name))
+            except FileNotFoundError:
+                pass  # already removed by the other process, it no longer counts
+            total -= size
@@ -1,9 +1,137 @@
-from ta.trend import EMAIndicator, MACD, ADXIndicator
-from ta.momentum import RSIIndicator, StochasticOscillator, WilliamsRIndicator
-from ta.volatility import BollingerBands, AverageTrueRange
+import numpy as np
+
+from . import kernels as k
+from .registry import feature
+
+
+# --- Trend ---
+
+@feature("ema_fast", inputs=["close"], warmup=9, recursive=True)
+def ema_fast(close):
+    return k.ema(close, span=10, min_periods=10)
+
+
+@feature("ema_slow", inputs=["close"], warmup=49, recursive=True)
+def ema_slow(close):
+    return k.ema(close, span=50, min_periods=50)
+
+
+@feature("ema_slope", inputs=["ema_fast"], warmup=1)
+def ema_slope(ema_fast):
+    return ema_fast - k.shift(ema_fast, 1)
+
+
+@feature("_ema_12", inputs=["close"], warmup=11, recursive=True)
+def _ema_12(close):
+    return k.ema(close, span=12, min_periods=12)
+
+
+@feature("_ema_26", inputs=["close"], warmup=25, recursive=True)
+def _ema_26(close):
+    return k.ema(close, span=26, min_periods=26)
+
+
+@feature("macd", inputs=["_ema_12", "_ema_26"])
+def macd(ema_12, ema_26):
+    return ema_12 - ema_26
+
+
+@feature("macd_signal", inputs=["macd"], warmup=8, recursive=True)
+def macd_signal(macd):
+    return k.ema(macd, span=9, min_periods=9)
+
+
+@feature("macd_hist", inputs=["macd", "macd_signal"])
+def macd_hist(macd, macd_signal):
+    return macd - macd_signal
+
+
+@feature("adx", inputs=["high", "low", "close"], warmup=27, recursive=True)
+def adx(high, low, close):
+    return k.adx(high, low, close, window=14)
+
+
+# --- Momentum ---
+
+@feature("rsi", inputs=["close"], warmup=14, recursive=True)
+def rsi(close):
+    diff = close - k.shift(close, 1)
+    up = k.ema(np.where(diff > 0, diff, 0.0), alpha=1 / 14, min_periods=14)
+    down = k.ema(np.where(diff < 0, -diff, 0.0), alpha=1 / 14, min_periods=14)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(down == 0, 100, 100 - (100 / (1 + up / down)))
+
+
+@feature("_highest_14", inputs=["high"], warmup=13)
+def _highest_14(high):
+    return k.rolling(high, 14, np.max)
+
+
+@feature("_lowest_14", inputs=["low"], warmup=13)
+def _lowest_14(low):
+    return k.rolling(low, 14, np.min)
+
+
+@feature("stoch_k", inputs=["close", "_highest_14", "_lowest_14"])
+def stoch_k(close, highest, lowest):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 * (close - lowest) / (highest - lowest)
+
+
+@feature("stoch_d", inputs=["stoch_k"], warmup=2)
+def stoch_d(stoch_k):
+    return k.rolling(stoch_k, 3, np.mean)
+
+
+@feature("williams_r", inputs=["close", "_highest_14", "_lowest_14"])
+def williams_r(close, highest, lowest):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return -100 * (highest - close) / (highest - lowest)
+
+
+# --- Volatility ---
+
+@feature("atr", inputs=["high", "low", "close"], warmup=13, recursive=True)
+def atr(high, low, close):
+    return k.atr(high, low, close, window=14)
+
+
+@feature("atr_norm", inputs=["atr", "close"])
+def atr_norm(atr, close):
+    return atr / close
+
+
+@feature("_bb_mavg", inputs=["close"], warmup=19)
+def _bb_mavg(close):
+    return k.rolling(close, 20, np.mean)
+
+
+@feature("_bb_std", inputs=["close"], warmup=19)
+def _bb_std(close):
+    return k.rolling(close, 20, np.std)
+
+
+@feature("bb_high", inputs=["_bb_mavg", "_bb_std"])
+def bb_high(mavg, mstd):
+    return mavg + 2 * mstd
+
+
+@feature("bb_low", inputs=["_bb_mavg", "_bb_std"])
+def bb_low(mavg, mstd):
+    return mavg - 2 * mstd
+
+
+@feature("bb_width", inputs=["bb_high", "bb_low", "_bb_mavg"])
+def bb_width(bb_high, bb_low, mavg):
+    return ((bb_high - bb_low) / mavg) * 100
 
 
 def add_indicators(df):
+    # ta reference implementation (see pipeline.build_features_ta)
+    from ta.trend import EMAIndicator, MACD, ADXIndicator
+    from ta.momentum import RSIIndicator, StochasticOscillator, WilliamsRIndicator
+    from ta.volatility import BollingerBands, AverageTrueRange
+
     df = df.copy()
 
     # Trend
@@ -0,0 +1,100 @@
+# features/kernels.py
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+OHLC_COLUMNS = ["open", "high", "low", "close"]
+
+
+# --- building blocks (float64 in, float64 out, NaN where ta gives NaN) ---
+
+def ema(x: np.ndarray, span: int = None, alpha: float = None, min_periods: int = 0) -> np.ndarray:
+    """pandas ewm(span|alpha, adjust=False, min_periods).mean(), leading NaNs skipped."""
+    com = (span - 1) / 2.0 if span is not None else 1.0 / alpha - 1.0
+    a = 1.0 / (1.0 + com)
+    out = np.full(len(x), np.nan)
+    valid = np.flatnonzero(~np.isnan(x))
+    if len(valid) == 0:
+        return out
+    start = valid[0]
+    y, _ = lfilter([a], [1.0, a - 1.0], x[start:], zi=[(1.0 - a) * x[start]])
+    y[:max(min_periods, 1) - 1] = np.nan
+    out[start:] = y
+    return out
+
+
+def wilder(x: np.ndarray, window: int, seed: float) -> np.ndarray:
+    """s[0] = seed, s[i] = (s[i-1] * (window - 1) + x[i]) / window for i >= 1."""
+    out = np.empty(len(x))
+    out[0] = seed
+    if len(x) > 1:
+        decay = (window - 1) / window
+        out[1:], _ = lfilter([1.0 / window], [1.0, -decay], x[1:], zi=[decay * seed])
+    return out
+
+
+def wilder_sum(x: np.ndarray, window: int, seed: float) -> np.ndarray:
+    """s[0] = seed, s[i] = s[i-1] - s[i-1] / window + x[i] for i >= 1 (ta's ADX smoothing)."""
+    out = np.empty(len(x))
+    out[0] = seed
+    if len(x) > 1:
+        decay = 1.0 - 1.0 / window
+        out[1:], _ = lfilter([1.0], [1.0, -decay], x[1:], zi=[decay * seed])
+    return out
+
+
+def rolling(x: np.ndarray, window: int, func) -> np.ndarray:
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1:] = func(sliding_window_view(x, window), axis=1)
+    return out
+
+
+def shift(x: np.ndarray, periods: int) -> np.ndarray:
+    out = np.full(len(x), np.nan)
+    out[periods:] = x[:-periods]
+    return out
+
+
+def true_range(high, low, prev_close):
+    tr = np.maximum(np.abs(high - prev_close), np.abs(low - prev_close))
+    tr = np.fmax(high - low, tr)  # first bar has no previous close
+    return tr
+
+
+def atr(high, low, close, window: int = 14) -> np.ndarray:
+    out = np.zeros(len(close))
+    if len(close) < window:
+        return out
+    tr = true_range(high, low, shift(close, 1))
+    out[window - 1:] = wilder(tr[window - 1:], window, tr[:window].mean())
+    return out
+
+
+def adx(high, low, close, window: int = 14) -> np.ndarray:
+    """ta.trend.ADXIndicator(...).adx(), zeros during warm-up like ta."""
+    n = len(close)
+    out = np.zeros(n)
+    if n < 2 * window:
+        return out
+    prev_close = shift(close, 1)
+    dm = np.maximum(high, prev_close) - np.minimum(low, prev_close)
+    diff_up = high - shift(high, 1)
+    diff_down = shift(low, 1) - low
+    pos = np.where((diff_up > diff_down) & (diff_up > 0), diff_up, 0.0)
+    neg = np.where((diff_down > diff_up) & (diff_down > 0), diff_down, 0.0)
+
+    # smoothed sums start at bar `window` and cover bars 1..window
+    trs = wilder_sum(dm[window:], window, dm[1:window + 1].sum())
+    dip = wilder_sum(pos[window:], window, pos[1:window + 1].sum())
+    din = wilder_sum(neg[window:], window, neg[1:window + 1].sum())
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        di_pos = np.where(trs != 0, 100 * (dip / trs), 0.0)
+        di_neg = np.where(trs != 0, 100 * (din / trs), 0.0)
+        di_sum = di_pos + di_neg
+        dx = np.where(di_sum != 0, 100 * np.abs((di_pos - di_neg) / di_sum), 0.0)
+
+    out[2 * window - 1:] = wilder(dx[window - 1:], window, dx[:window].mean())
+    return out
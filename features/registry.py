@@ -0,0 +1,99 @@
+# features/registry.py
+
+import numpy as np
+
+from config import settings as cfg
+
+# inputs every feature can depend on without declaring a producer
+BASE_INPUTS = ("open", "high", "low", "close", "time")
+
+
+class Feature:
+    """
+    One registered feature column.
+
+    inputs:    names of base inputs or other features it is computed from
+    warmup:    rows after its inputs become valid until its own first valid row
+    recursive: value depends on all history (EMA/Wilder smoothing), so more
+               than `warmup` rows are needed before it converges
+    """
+
+    def __init__(self, name, fn, inputs, warmup=0, recursive=False):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.warmup = warmup
+        self.recursive = recursive
+        self.module = fn.__module__
+
+    @property
+    def public(self) -> bool:
+        return not self.name.startswith("_")
+
+
+FEATURES = {}
+
+
+def feature(name, inputs, warmup=0, recursive=False):
+    """Register fn(*inputs) -> array as feature `name`. Names starting with _ are intermediates."""
+    def decorator(fn):
+        if name in FEATURES or name in BASE_INPUTS:
+            raise ValueError(f"Feature already registered: {name}")
+        for dep in inputs:
+            if dep not in FEATURES and dep not in BASE_INPUTS:
+                raise ValueError(f"Feature {name} depends on unknown input {dep}")
+        FEATURES[name] = Feature(name, fn, inputs, warmup, recursive)
+        return fn
+    return decorator
+
+
+def feature_names(module: str):
+    """Public features registered from `module`, in registration order."""
+    return [f.name for f in FEATURES.values() if f.public and f.module == module]
+
+
+def resolve(columns):
+    """Features needed for `columns` (dependencies included), in computable order."""
+    needed = set()
+    stack = [c for c in columns if c not in BASE_INPUTS]
+    while stack:
+        name = stack.pop()
+        if name in needed:
+            continue
+        if name not in FEATURES:
+            raise KeyError(f"Unknown feature: {name}")
+        needed.add(name)
+        stack.extend(dep for dep in FEATURES[name].inputs if dep not in BASE_INPUTS)
+    # registration order is topological: inputs must be registered first
+    return [FEATURES[name] for name in FEATURES if name in needed]
+
+
+def required_lookback(columns, recursive_mult: float = cfg.FEATURE_WARMUP_MULT) -> int:
+    """
+    Bars of history needed so that the last row of `columns` is valid.
+    Recursive features get recursive_mult times their warm-up so their
+    starting transient has decayed.
+    """
+    lookback = {name: 0 for name in BASE_INPUTS}
+    for f in resolve(columns):
+        own = int(np.ceil(f.warmup * (recursive_mult if f.recursive else 1)))
+        lookback[f.name] = own + max(lookback[dep] for dep in f.inputs)
+    return max((lookback[c] for c in columns), default=0) + 1
+
+
+def compute_feature_matrix(df, columns, dtype=np.float64) -> np.ndarray:
+    """
+    Compute `columns` (base inputs or features) into one preallocated
+    (len(df), len(columns)) matrix. Only the requested features and their
+    dependencies are evaluated. Column-major, so each column is written
+    contiguously and pandas can wrap it without a copy.
+    """
+    values = {name: df[name].to_numpy(dtype=np.float64) for name in ("open", "high", "low", "close")}
+    values["time"] = df.index
+    for f in resolve(columns):
+        values[f.name] = f.fn(*(values[dep] for dep in f.inputs))
+
+    out = np.empty((len(df), len(columns)), dtype=dtype, order="F")
+    for j, name in enumerate(columns):
+        out[:, j] = values[name]
+    return out
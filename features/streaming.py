@@ -0,0 +1,341 @@
+# features/streaming.py
+
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from .pipeline import FEATURE_COLUMNS
+
+NAN = float("nan")
+OHLC_COLUMNS = ["open", "high", "low", "close"]
+
+# same vectorized expression as the ta reference, so hour_sin/hour_cos match bit for bit
+_HOURS = np.arange(24)
+_HOUR_SIN = np.sin(2 * np.pi * _HOURS / 24).tolist()
+_HOUR_COS = np.cos(2 * np.pi * _HOURS / 24).tolist()
+
+
+def _div(a, b):
+    # IEEE division like pandas/numpy instead of ZeroDivisionError
+    if b == 0:
+        if a == 0 or a != a:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+class _Ewm:
+    """pandas ewm(adjust=False).mean() one value at a time (same arithmetic)."""
+    __slots__ = ("factor", "new_wt", "min_periods", "weighted", "old_wt", "nobs")
+
+    def __init__(self, com: float, min_periods: int):
+        alpha = 1.0 / (1.0 + com)
+        self.factor = 1.0 - alpha
+        self.new_wt = alpha
+        self.min_periods = max(min_periods, 1)
+        self.weighted = NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    @classmethod
+    def span(cls, span: int, min_periods: int):
+        return cls((span - 1) / 2.0, min_periods)
+
+    @classmethod
+    def alpha(cls, alpha: float, min_periods: int):
+        return cls(1.0 / alpha - 1.0, min_periods)
+
+    def update(self, x: float) -> float:
+        is_obs = x == x
+        self.nobs += is_obs
+        w = self.weighted
+        if w == w:
+            self.old_wt *= self.factor
+            if is_obs:
+                if w != x:
+                    w = self.old_wt * w + self.new_wt * x
+                    w /= (self.old_wt + self.new_wt)
+                self.old_wt = 1.0
+        elif is_obs:
+            w = x
+        self.weighted = w
+        return w if self.nobs >= self.min_periods else NAN
+
+    def state(self):
+        return self.weighted, self.old_wt, self.nobs
+
+    def set_state(self, state):
+        self.weighted, self.old_wt, self.nobs = state
+
+
+class StreamingFeatures:
+    """
+    Incremental version of build_features for the live loop.
+
+    Seed it with from_history(df) and call update() once per new bar; every
+    column of build_features is updated in O(1) from running state instead
+    of recomputing the whole window. update() with the same timestamp as the
+    previous bar replaces that bar (MT5's forming bar changes until it closes).
+    Values match the ta reference over the same history (see check_parity).
+    The row follows the registry's column order (OHLC + FEATURE_COLUMNS);
+    `required` limits which columns must be valid for ready (default all).
+    """
+
+    columns = OHLC_COLUMNS + FEATURE_COLUMNS
+
+    def __init__(self, window: int = 14, required=None):
+        self.window = window
+        self.required = None if required is None else np.array([self.columns.index(c) for c in required])
+        self.count = 0
+        self.last_time = None
+        self.row = np.full(len(self.columns), np.nan)
+        self._prev = None
+
+        self.closes = deque(maxlen=21)    # ret_1/5/20 and diffs
+        self.highs = deque(maxlen=window)  # stochastic / williams %R
+        self.lows = deque(maxlen=window)
+        self.bb_closes = deque(maxlen=20)
+        self.stoch_ks = deque(maxlen=3)
+
+        self.ema_fast = _Ewm.span(10, 10)
+        self.ema_slow = _Ewm.span(50, 50)
+        self.ema_12 = _Ewm.span(12, 12)
+        self.ema_26 = _Ewm.span(26, 26)
+        self.macd_signal = _Ewm.span(9, 9)
+        self.rsi_up = _Ewm.alpha(1 / window, window)
+        self.rsi_down = _Ewm.alpha(1 / window, window)
+        self.last_ema_fast = NAN
+        self.prev_high = NAN
+        self.prev_low = NAN
+
+        # ATR / ADX use ta's Wilder smoothing, seeded with a plain sum/mean
+        self.atr = 0.0
+        self.tr_seed = []
+        self.trs = 0.0
+        self.dip = 0.0
+        self.din = 0.0
+        self.adx = 0.0
+        self.dm_seed = []
+        self.dx_seed = []
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, **kwargs):
+        engine = cls(**kwargs)
+        engine.update_frame(df)
+        return engine
+
+    # --- state handling ---
+
+    def _snapshot(self):
+        state = {}
+        ewms = []
+        for name, value in self.__dict__.items():
+            if isinstance(value, _Ewm):
+                ewms.append((value, value.state()))
+            elif isinstance(value, (deque, list)):
+                state[name] = value.copy()
+            elif name != "_prev":
+                state[name] = value
+        return state, ewms
+
+    def _restore(self, snapshot):
+        state, ewms = snapshot
+        self.__dict__.update(state)
+        for ewm, ewm_state in ewms:
+            ewm.set_state(ewm_state)
+        self._prev = None
+
+    @property
+    def ready(self) -> bool:
+        """True when the last row has no NaN, i.e. it would survive dropna()."""
+        row = self.row if self.required is None else self.row[self.required]
+        return self.count > 0 and not np.isnan(row).any()
+
+    # --- updates ---
+
+    def update_frame(self, df: pd.DataFrame):
+        values = df[OHLC_COLUMNS].to_numpy(dtype=float)
+        hours = df.index.hour
+        for ts, hour, (o, h, l, c) in zip(df.index, hours, values):
+            self.update(ts, o, h, l, c, hour=hour)
+        return self.row
+
+    def update_arrays(self, times, hours, ohlc):
+        """update() over parallel sequences of timestamps, hours and OHLC rows (e.g. BarWindow views)."""
+        for ts, hour, (o, h, l, c) in zip(times, hours, ohlc):
+            self.update(ts, o, h, l, c, hour=int(hour))
+        return self.row
+
+    def update(self, ts, o: float, h: float, l: float, c: float, hour: int = None) -> np.ndarray:
+        if ts is not None and ts == self.last_time and self._prev is not None:
+            self._restore(self._prev)
+        self._prev = self._snapshot()
+        self.last_time = ts
+        if hour is None:
+            hour = ts.hour
+
+        p = self.count
+        w = self.window
+        prev_close = self.closes[-1] if self.closes else NAN
+
+        # basic returns
+        ret_1 = c / self.closes[-1] - 1 if p >= 1 else NAN
+        ret_5 = c / self.closes[-5] - 1 if p >= 5 else NAN
+        ret_20 = c / self.closes[-20] - 1 if p >= 20 else NAN
+        self.closes.append(c)
+
+        # candle structure
+        range_norm = (h - l) / c
+        body = (c - o) / o
+        upper_wick = (h - max(o, c)) / c
+        lower_wick = (min(o, c) - l) / c
+
+        # trend
+        ema_fast = self.ema_fast.update(c)
+        ema_slow = self.ema_slow.update(c)
+        ema_slope = ema_fast - self.last_ema_fast
+        self.last_ema_fast = ema_fast
+        macd = self.ema_12.update(c) - self.ema_26.update(c)
+        macd_signal = self.macd_signal.update(macd)
+        macd_hist = macd - macd_signal
+
+        adx = self._update_adx(p, h, l, prev_close)
+
+        # momentum
+        diff = c - prev_close
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else -0.0
+        ema_up = self.rsi_up.update(up)
+        ema_down = self.rsi_down.update(down)
+        if ema_down != ema_down:
+            rsi = NAN
+        elif ema_down == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - (100 / (1 + ema_up / ema_down))
+
+        self.highs.append(h)
+        self.lows.append(l)
+        if len(self.highs) == w:
+            highest, lowest = max(self.highs), min(self.lows)
+            stoch_k = _div(100 * (c - lowest), highest - lowest)
+            williams_r = _div(-100 * (highest - c), highest - lowest)
+        else:
+            stoch_k = williams_r = NAN
+        self.stoch_ks.append(stoch_k)
+        stoch_d = sum(self.stoch_ks) / 3 if len(self.stoch_ks) == 3 else NAN
+
+        # volatility
+        tr = h - l if p == 0 else max(h - l, abs(h - prev_close), abs(l - prev_close))
+        if p < w:
+            self.tr_seed.append(tr)
+            if p == w - 1:
+                self.atr = float(np.mean(self.tr_seed))
+        else:
+            self.atr = (self.atr * (w - 1) + tr) / float(w)
+        atr = self.atr
+
+        self.bb_closes.append(c)
+        if len(self.bb_closes) == 20:
+            window_values = self.bb_closes
+            mavg = sum(window_values) / 20
+            mstd = math.sqrt(sum((x - mavg) ** 2 for x in window_values) / 20)
+            bb_high = mavg + 2 * mstd
+            bb_low = mavg - 2 * mstd
+            bb_width = ((bb_high - bb_low) / mavg) * 100
+        else:
+            bb_high = bb_low = bb_width = NAN
+
+        self.prev_high, self.prev_low = h, l
+        self.count = p + 1
+
+        values = {
+            "open": o, "high": h, "low": l, "close": c,
+            "ret_1": ret_1, "ret_5": ret_5, "ret_20": ret_20,
+            "range_norm": range_norm, "body": body, "upper_wick": upper_wick, "lower_wick": lower_wick,
+            "hour": hour, "hour_sin": _HOUR_SIN[hour], "hour_cos": _HOUR_COS[hour],
+            "ema_fast": ema_fast, "ema_slow": ema_slow, "ema_slope": ema_slope,
+            "macd": macd, "macd_signal": macd_signal, "macd_hist": macd_hist,
+            "adx": adx, "rsi": rsi, "stoch_k": stoch_k, "stoch_d": stoch_d, "williams_r": williams_r,
+            "atr": atr, "atr_norm": atr / c,
+            "bb_high": bb_high, "bb_low": bb_low, "bb_width": bb_width,
+        }
+        # laid out in the registry's order; a registered feature missing here fails loudly
+        self.row = np.array([values[name] for name in self.columns])
+        return self.row
+
+    def _update_adx(self, p, h, l, prev_close):
+        w = self.window
+        if p == 0:
+            return 0.0
+
+        dm = max(h, prev_close) - min(l, prev_close)
+        diff_up = h - self.prev_high
+        diff_down = self.prev_low - l
+        pos = diff_up if (diff_up > diff_down and diff_up > 0) else 0.0
+        neg = diff_down if (diff_down > diff_up and diff_down > 0) else 0.0
+
+        if p < w:
+            self.dm_seed.append((dm, pos, neg))
+            return 0.0
+        if p == w:
+            self.dm_seed.append((dm, pos, neg))
+            seed = np.array(self.dm_seed)
+            self.trs, self.dip, self.din = (float(np.sum(seed[:, k])) for k in range(3))
+            self.dm_seed = []
+        else:
+            self.trs = self.trs - (self.trs / float(w)) + dm
+            self.dip = self.dip - (self.dip / float(w)) + pos
+            self.din = self.din - (self.din / float(w)) + neg
+
+        if self.trs != 0:
+            di_pos = 100 * (self.dip / self.trs)
+            di_neg = 100 * (self.din / self.trs)
+        else:
+            di_pos = di_neg = 0.0
+        if di_pos + di_neg != 0:
+            dx = 100 * abs((di_pos - di_neg) / (di_pos + di_neg))
+        else:
+            dx = 0.0
+
+        if p < 2 * w - 1:
+            self.dx_seed.append(dx)
+            return 0.0
+        if p == 2 * w - 1:
+            self.dx_seed.append(dx)
+            self.adx = float(np.mean(self.dx_seed))
+            self.dx_seed = []
+        else:
+            self.adx = ((self.adx * (w - 1)) + dx) / float(w)
+        return self.adx
+
+    # --- output ---
+
+    def frame(self) -> pd.DataFrame:
+        """Last row as a one-row frame with the same columns as build_features."""
+        return pd.DataFrame([self.row], columns=self.columns, index=[self.last_time])
+
+
+def check_parity(df: pd.DataFrame, rtol: float = 1e-9, atol: float = 1e-6) -> float:
+    """
+    Feed df bar by bar and compare every row with build_features_ta(df).
+    Returns the max absolute difference; raises AssertionError on mismatch.
+    """
+    from .pipeline import build_features_ta
+
+    batch = build_features_ta(df)
+    engine = StreamingFeatures()
+    rows = {}
+    for ts, hour, (o, h, l, c) in zip(df.index, df.index.hour, df[OHLC_COLUMNS].to_numpy(dtype=float)):
+        row = engine.update(ts, o, h, l, c, hour=hour)
+        if engine.ready:
+            rows[ts] = row.copy()
+    stream = pd.DataFrame.from_dict(rows, orient="index", columns=StreamingFeatures.columns)
+
+    expected = batch[StreamingFeatures.columns].to_numpy(dtype=float)
+    actual = stream.to_numpy()
+    assert stream.index.equals(batch.index), "streaming and batch rows differ"
+    assert np.allclose(actual, expected, rtol=rtol, atol=atol), "streaming features diverge from batch"
+    return float(np.max(np.abs(actual - expected))) if len(actual) else 0.0
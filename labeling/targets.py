@@ -1,8 +1,18 @@
+import numpy as np
 import pandas as pd
 
+from config import settings as cfg
+from features.cache import FeatureCache, frame_key
+
 ENCODE_MAP = {-1: 0, 0: 1, 1: 2}
 DECODE_MAP = {0: -1, 1: 0, 2: 1}
 
+# label matrix entry for rows that cannot be labeled (horizon past the end of the data, no ATR)
+NO_LABEL = -1
+LABEL_VERSION = 1
+# rows per block in the triple-barrier scan, bounds the (horizon, rows) scratch matrices
+BARRIER_CHUNK = 65536
+
 
 def add_directional_target(df: pd.DataFrame, horizon: int = 12) -> pd.DataFrame:
     df = df.copy()
@@ -18,3 +28,164 @@ def add_directional_target(df: pd.DataFrame, horizon: int = 12) -> pd.DataFrame:
     df["target"] = df["target_raw"].map(ENCODE_MAP)
 
     return df.dropna()
+
+
+def future_returns(close: np.ndarray, horizons) -> np.ndarray:
+    """(len(close), len(horizons)) matrix of (close[i+h] - close[i]) / close[i], NaN past the end."""
+    close = np.asarray(close, dtype=np.float64)
+    horizons = np.asarray(horizons)
+    n = len(close)
+    ahead = np.arange(n)[:, None] + horizons[None, :]
+    future = np.where(ahead < n, close[np.minimum(ahead, n - 1)], np.nan)
+    return (future - close[:, None]) / close[:, None]
+
+
+def build_label_matrix(df: pd.DataFrame, horizons=None, use_cache=False) -> pd.DataFrame:
+    """
+    Encoded directional targets (see ENCODE_MAP) for every horizon at once.
+
+    One int8 column per horizon, indexed like df; rows whose horizon runs
+    past the end of df hold NO_LABEL. Same labels as add_directional_target,
+    without copying df. With use_cache the matrix is stored next to the
+    cached features, keyed by the close series and the horizons.
+    """
+    if horizons is None:
+        horizons = range(cfg.HORIZON_RANGE[0], cfg.HORIZON_RANGE[1] + 1)
+    horizons = [int(h) for h in horizons]
+
+    if use_cache:
+        cache = FeatureCache()
+        key = frame_key(df[["close"]], "labels", LABEL_VERSION, ",".join(map(str, horizons)))
+        labels = cache.get(key)
+        if labels is None:
+            labels = build_label_matrix(df, horizons)
+            cache.put(key, labels)
+        return labels
+
+    ret = future_returns(df["close"].to_numpy(), horizons)
+    # sign() + 1 maps -1/0/1 straight onto ENCODE_MAP's 0/1/2
+    missing = np.isnan(ret)
+    ret[missing] = 0.0
+    labels = (np.sign(ret) + 1).astype(np.int8)
+    labels[missing] = NO_LABEL
+    return pd.DataFrame(labels, index=df.index, columns=horizons, copy=False)
+
+
+def select_target(df_feat: pd.DataFrame, labels: pd.DataFrame, column):
+    """
+    X, y for one label column (a horizon, or an (sl_mult, tp_mult) pair):
+    the labeled rows of df_feat and their encoded targets. When only the
+    trailing rows are unlabeled, X is a row slice of df_feat (no copy).
+    """
+    y = labels[column]
+    labeled = y.to_numpy() != NO_LABEL
+    n_labeled = len(labeled) if labeled.all() else int(labeled.argmin())
+    if labeled[n_labeled:].any():
+        return df_feat[labeled], y[labeled]
+    return df_feat.iloc[:n_labeled], y.iloc[:n_labeled]
+
+
+def _running_extremes(values: np.ndarray, start: int, stop: int, horizon: int, func) -> np.ndarray:
+    """(horizon, stop - start) running func (max/min) of values[i+1 .. i+k] for rows i, k = 1..horizon."""
+    out = np.empty((horizon, stop - start))
+    out[0] = values[start + 1:stop + 1]
+    for k in range(1, horizon):
+        func(out[k - 1], values[start + k + 1:stop + k + 1], out=out[k])
+    return out
+
+
+def _first_passage(extremes: np.ndarray, levels: np.ndarray, above: bool) -> np.ndarray:
+    """
+    1-based bar of the first running extreme beyond each row's level,
+    horizon + 1 if never. Extremes are monotone along the horizon, so the
+    bars before the first passage are exactly those not beyond the level.
+    """
+    passage = np.ones(len(levels), dtype=np.int64)
+    for row in extremes:
+        passage += (row < levels) if above else (row > levels)
+    return passage
+
+
+def triple_barrier_matrix(df: pd.DataFrame, horizon: int = cfg.HORIZON, pairs=None) -> pd.DataFrame:
+    """
+    Triple-barrier targets for several (sl_mult, tp_mult) pairs at once.
+
+    Mirrors backtest_hedging's exits for a trade entered at close[i] with
+    atr[i]: a long wins when high reaches close + tp_mult*atr no later than
+    low reaches close - sl_mult*atr (TP wins ties within a bar, like the
+    backtest), a short symmetrically. Only bars i+1..i+horizon count (the
+    vertical barrier). The target is 1 (ENCODE_MAP: up) when only the long
+    wins or it wins first, -1 for the short, 0 otherwise. One int8 column per
+    pair, encoded like build_label_matrix; the last `horizon` rows and rows
+    without a positive ATR hold NO_LABEL.
+
+    First passages come from running highs/lows over the horizon, computed
+    once per block of rows and compared against every distinct multiplier,
+    so extra pairs cost only a few vector comparisons each.
+    """
+    if pairs is None:
+        pairs = [(cfg.SL_MULT, cfg.TP_MULT)]
+    pairs = [(float(sl), float(tp)) for sl, tp in pairs]
+    mults = sorted({m for pair in pairs for m in pair})
+
+    close = df["close"].to_numpy(dtype=np.float64)
+    high = df["high"].to_numpy(dtype=np.float64)
+    low = df["low"].to_numpy(dtype=np.float64)
+    atr = df["atr"].to_numpy(dtype=np.float64)
+    n = len(close)
+    labels = np.full((n, len(pairs)), NO_LABEL, dtype=np.int8)
+
+    n_rows = n - horizon
+    if n_rows > 0:
+        for start in range(0, n_rows, BARRIER_CHUNK):
+            stop = min(start + BARRIER_CHUNK, n_rows)
+            # row i sees bars i+1 .. i+horizon
+            run_high = _running_extremes(high, start, stop, horizon, np.maximum)
+            run_low = _running_extremes(low, start, stop, horizon, np.minimum)
+            c = close[start:stop]
+            a = atr[start:stop]
+
+            up, down = {}, {}
+            for m in mults:
+                up[m] = _first_passage(run_high, c + m * a, above=True)
+                down[m] = _first_passage(run_low, c - m * a, above=False)
+
+            never = horizon + 1
+            for j, (sl, tp) in enumerate(pairs):
+                long_t = np.where(up[tp] <= down[sl], up[tp], never)
+                short_t = np.where(down[tp] <= up[sl], down[tp], never)
+                # +1 when the long target is reached first, -1 for the short
+                labels[start:stop, j] = np.sign(short_t - long_t) + 1
+
+        valid_atr = atr[:n_rows] > 0
+        labels[:n_rows][~valid_atr] = NO_LABEL
+
+    return pd.DataFrame(labels, index=df.index, columns=pd.MultiIndex.from_tuples(pairs), copy=False)
+
+
+def triple_barrier_labels(df: pd.DataFrame, horizon: int = cfg.HORIZON,
+                          sl_mult: float = cfg.SL_MULT, tp_mult: float = cfg.TP_MULT) -> pd.DataFrame:
+    """Single-pair triple_barrier_matrix; select with select_target(df, labels, (sl_mult, tp_mult))."""
+    return triple_barrier_matrix(df, horizon, [(sl_mult, tp_mult)])
+
+
+def build_target(df_feat: pd.DataFrame, horizon: int, sl_mult: float = cfg.SL_MULT,
+                 tp_mult: float = cfg.TP_MULT, target_type: str = None, use_cache=False, labels=None):
+    """
+    X, y for training with the configured target (cfg.TARGET_TYPE).
+    labels: a build_label_matrix(df_feat) result to select direction targets from.
+    """
+    target_type = target_type or cfg.TARGET_TYPE
+    if target_type == "direction":
+        if labels is not None and horizon in labels.columns:
+            return select_target(df_feat, labels, horizon)
+        if use_cache:
+            # the whole search range at once, so other horizons hit the cache
+            labels = build_label_matrix(df_feat, use_cache=True)
+            if horizon in labels.columns:
+                return select_target(df_feat, labels, horizon)
+        return select_target(df_feat, build_label_matrix(df_feat, horizons=[horizon]), horizon)
+    if target_type == "triple_barrier":
+        labels = triple_barrier_labels(df_feat, horizon, sl_mult, tp_mult)
+        return select_target(df_feat, labels, (float(sl_mult), float(tp_mult)))
+    raise ValueError(f"Unsupported target type: {target_type}")
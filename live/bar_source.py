@@ -0,0 +1,131 @@
+# live/bar_source.py
+
+import time
+
+import pandas as pd
+
+from config import settings as cfg
+from live.bar_store import BarStore, rates_to_frame, to_epoch
+from utils.timeframes import TIMEFRAME_MINUTES, timeframe_seconds
+
+
+class BarSource:
+    """
+    Where the pipeline gets its OHLC bars from.
+
+    get_rates() serves a historical [start, end] window (training/backtests),
+    get_bars() the latest n bars and wait_for_next_bar() blocks until the next
+    bar is due (live loop). wait_for_next_bar() returns False once the source
+    has no more bars to serve.
+
+    Realtime sources also answer latest_bar_time() cheaply, so the live
+    runtime polls it around the bar close instead of sleeping blindly.
+    """
+
+    realtime = False
+
+    def init(self):
+        pass
+
+    def get_rates(self, symbol: str, timeframe: str, start_date, end_date) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def get_bars(self, symbol: str, timeframe: str, n: int = 500) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def wait_for_next_bar(self, timeframe: str) -> bool:
+        raise NotImplementedError
+
+    def latest_bar_time(self, symbol: str, timeframe: str):
+        bars = self.get_bars(symbol, timeframe, n=1)
+        return bars.index[-1] if bars is not None and len(bars) else None
+
+
+class MT5BarSource(BarSource):
+    """Live MetaTrader 5 terminal (historical ranges go through the bar store)."""
+
+    realtime = True
+
+    def init(self):
+        from live.mt5_client import init_mt5
+        init_mt5()
+
+    def get_rates(self, symbol, timeframe, start_date, end_date):
+        from live.mt5_client import get_mt5_rates
+        return get_mt5_rates(symbol, timeframe, start_date, end_date)
+
+    def get_bars(self, symbol, timeframe, n=500):
+        from live.mt5_client import get_bars
+        return get_bars(symbol, timeframe, n=n)
+
+    def wait_for_next_bar(self, timeframe):
+        from utils.sleeping import sleep_until_next_bar
+        sleep_until_next_bar(TIMEFRAME_MINUTES[timeframe], tz=cfg.LOCAL_TZ)
+        return True
+
+    def latest_bar_time(self, symbol, timeframe):
+        from live.mt5_client import get_latest_bar_time
+        return get_latest_bar_time(symbol, timeframe)
+
+
+class ReplayBarSource(BarSource):
+    """
+    Serves bars previously saved in the local bar store, no terminal needed.
+
+    get_bars() returns the n bars ending at a replay cursor that moves one bar
+    forward on every wait_for_next_bar() call. speed is a multiple of real
+    time (speed=60 replays an M5 bar every 5 seconds); speed=0 replays as
+    fast as the consumer asks.
+    """
+
+    def __init__(self, speed: float = cfg.REPLAY_SPEED, start=None, root: str = cfg.BAR_STORE_DIR):
+        self.speed = speed
+        self.start = start
+        self.root = root
+        self._bars = {}
+        self._cursor = {}
+
+    def _load(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        if key not in self._bars:
+            bars = BarStore(symbol, timeframe, root=self.root).slice(0, 2 ** 62)
+            if len(bars) == 0:
+                raise RuntimeError(f"No stored bars for {symbol} {timeframe} in {self.root}")
+            self._bars[key] = bars
+        return self._bars[key]
+
+    def get_rates(self, symbol, timeframe, start_date, end_date):
+        rates = BarStore(symbol, timeframe, root=self.root).slice(to_epoch(start_date), to_epoch(end_date))
+        if len(rates) == 0:
+            raise RuntimeError(f"No stored bars for {symbol} {timeframe} between {start_date} and {end_date}")
+        return rates_to_frame(rates)
+
+    def get_bars(self, symbol, timeframe, n=500):
+        bars = self._load(symbol, timeframe)
+        key = (symbol, timeframe)
+        if key not in self._cursor:
+            first = 0
+            if self.start is not None:
+                first = int(bars["time"].searchsorted(to_epoch(self.start)))
+            self._cursor[key] = min(max(first, n - 1), len(bars) - 1)
+        end = self._cursor[key] + 1
+        return rates_to_frame(bars[max(0, end - n):end])
+
+    def wait_for_next_bar(self, timeframe):
+        if self.speed:
+            time.sleep(timeframe_seconds(timeframe) / self.speed)
+        exhausted = True
+        for (symbol, tf), cursor in self._cursor.items():
+            if tf == timeframe and cursor + 1 < len(self._bars[(symbol, tf)]):
+                self._cursor[(symbol, tf)] = cursor + 1
+                exhausted = False
+        return not exhausted or not self._cursor
+
+
+def get_bar_source(name: str = None) -> BarSource:
+    name = name or cfg.BAR_SOURCE
+    if name == "mt5":
+        return MT5BarSource()
+    if name == "replay":
+        return ReplayBarSource()
+    raise ValueError(f"Unsupported bar source: {name}")
@@ -0,0 +1,214 @@
+# live/bar_store.py
+
+import io
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from config import settings as cfg
+
+BAR_DTYPE = np.dtype([
+    ("time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+])
+
+# Ranges ending closer than this to "now" may still contain a forming bar,
+# so they are only marked as covered up to the last bar we received.
+FINAL_LAG_SECONDS = 24 * 60 * 60
+
+
+def to_epoch(value) -> int:
+    """Naive datetimes are treated as UTC, the same way MT5 receives them."""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def from_epoch(seconds: int) -> datetime:
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(tzinfo=None)
+
+
+def rates_to_frame(rates) -> pd.DataFrame:
+    """OHLC frame indexed by bar time converted from UTC to LOCAL_TZ."""
+    df = pd.DataFrame({
+        "open": rates["open"],
+        "high": rates["high"],
+        "low": rates["low"],
+        "close": rates["close"],
+    }, index=pd.to_datetime(rates["time"], unit="s", utc=True).tz_convert(cfg.LOCAL_TZ))
+    df.index.name = "time"
+    return df
+
+
+def _merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class BarStore:
+    """
+    Local OHLC store for one symbol/timeframe under cfg.BAR_STORE_DIR.
+
+    Bars live in a single sorted .npy file (memory-mapped on read) and
+    meta.json records which [start, end] epoch ranges were already requested
+    from the terminal, so gaps like weekends are not downloaded again. A
+    range is only marked up to the last bar the terminal returned for it.
+
+    Downloads that only replace or extend the newest stored bars (the usual
+    incremental fetch) are written in place at the end of the file; older
+    or interleaved ranges rewrite it.
+    """
+
+    def __init__(self, symbol: str, timeframe: str, root: str = cfg.BAR_STORE_DIR):
+        safe_symbol = "".join(c if c.isalnum() else "_" for c in symbol).strip("_")
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.dir = os.path.join(root, f"{safe_symbol}_{timeframe}")
+        self.bars_path = os.path.join(self.dir, "bars.npy")
+        self.meta_path = os.path.join(self.dir, "meta.json")
+
+    # --- persistence ---
+
+    def _load_bars(self, mmap: bool = True) -> np.ndarray:
+        if not os.path.exists(self.bars_path):
+            return np.empty(0, dtype=BAR_DTYPE)
+        return np.load(self.bars_path, mmap_mode="r" if mmap else None)
+
+    def coverage(self):
+        if not os.path.exists(self.meta_path):
+            return []
+        with open(self.meta_path, "r") as f:
+            return json.load(f)["coverage"]
+
+    def _write_bars(self, bars: np.ndarray):
+        os.makedirs(self.dir, exist_ok=True)
+        tmp_bars = self.bars_path + ".tmp.npy"
+        np.save(tmp_bars, bars)
+        os.replace(tmp_bars, self.bars_path)
+
+    def _write_tail(self, new: np.ndarray) -> bool:
+        """
+        Write new over the stored bars from its first bar time on, in place:
+        the bars first, then the header's row count, so an interrupted write
+        leaves the old file readable. Returns False without writing when new
+        would drop stored bars (an older or interleaved range).
+        """
+        if len(new) == 0 or not os.path.exists(self.bars_path) or (np.diff(new["time"]) <= 0).any():
+            return False
+        times = self._load_bars()["time"]
+        pos = int(np.searchsorted(times, new["time"][0]))
+        replaced = np.isin(times[pos:], new["time"]).all()
+        del times  # release the memory map before writing
+        if not replaced:
+            return False
+
+        with open(self.bars_path, "r+b") as f:
+            if np.lib.format.read_magic(f) != (1, 0):
+                return False
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            offset = f.tell()
+            header = io.BytesIO()
+            np.lib.format.write_array_header_1_0(header, {"descr": np.lib.format.dtype_to_descr(BAR_DTYPE),
+                                                          "fortran_order": False, "shape": (pos + len(new),)})
+            # np.save leaves room in the header for the row count to grow
+            if dtype != BAR_DTYPE or fortran_order or header.tell() != offset:
+                return False
+            f.seek(offset + pos * BAR_DTYPE.itemsize)
+            f.write(new.tobytes())
+            f.truncate()
+            f.seek(0)
+            f.write(header.getvalue())
+        return True
+
+    def _write_meta(self, coverage):
+        os.makedirs(self.dir, exist_ok=True)
+        tmp_meta = self.meta_path + ".tmp"
+        with open(tmp_meta, "w") as f:
+            json.dump({"symbol": self.symbol, "timeframe": self.timeframe,
+                       "coverage": coverage}, f)
+        os.replace(tmp_meta, self.meta_path)
+
+    # --- queries ---
+
+    def missing_ranges(self, start: int, end: int):
+        missing = []
+        cursor = start
+        for cov_start, cov_end in self.coverage():
+            if cov_end < cursor:
+                continue
+            if cov_start > end:
+                break
+            if cov_start > cursor:
+                missing.append((cursor, cov_start - 1))
+            cursor = max(cursor, cov_end + 1)
+            if cursor > end:
+                break
+        if cursor <= end:
+            missing.append((cursor, end))
+        return missing
+
+    def slice(self, start: int, end: int) -> np.ndarray:
+        bars = self._load_bars()
+        lo = np.searchsorted(bars["time"], start, side="left")
+        hi = np.searchsorted(bars["time"], end, side="right")
+        out = np.array(bars[lo:hi])
+        del bars  # release the memory map before any later rewrite
+        return out
+
+    # --- updates ---
+
+    def append(self, rates, start: int, end: int):
+        """
+        Merge downloaded MT5 rates requested for [start, end] and mark the
+        range as covered up to the last bar received.
+        """
+        new = np.empty(len(rates), dtype=BAR_DTYPE)
+        for name in BAR_DTYPE.names:
+            new[name] = rates[name]
+
+        # MT5 may return only part of the range (history still loading, the
+        # terminal's bar limit): what is past the last bar is requested again
+        last = int(new["time"][-1]) if len(new) else start - 1
+        end = min(end, last)
+        if end > time.time() - FINAL_LAG_SECONDS:
+            # the newest bar may still be forming: fetch it again next time
+            end = last - 1
+
+        if not self._write_tail(new):
+            existing = self._load_bars(mmap=False)
+            # new bars first so np.unique keeps the freshest copy of a duplicate
+            combined = np.concatenate([new, existing])
+            _, keep = np.unique(combined["time"], return_index=True)
+            self._write_bars(combined[keep])
+
+        coverage = self.coverage()
+        if end >= start:
+            coverage.append([start, end])
+        self._write_meta(_merge_intervals(coverage))
+
+    def fetch(self, start, end, downloader) -> np.ndarray:
+        """
+        Return bars in [start, end], downloading only ranges not seen before.
+        downloader(date_from, date_to) -> MT5 rates array or None.
+        """
+        start, end = to_epoch(start), to_epoch(end)
+        for gap_start, gap_end in self.missing_ranges(start, end):
+            rates = downloader(from_epoch(gap_start), from_epoch(gap_end))
+            if rates is None:
+                continue
+            self.append(rates, gap_start, gap_end)
+        return self.slice(start, end)
@@ -0,0 +1,117 @@
+# live/bar_window.py
+
+import numpy as np
+import pandas as pd
+
+from features.kernels import OHLC_COLUMNS
+
+FETCH_BARS = 3  # bars requested per cycle: the forming bar, the one that just closed and one of overlap
+
+
+class BarWindow:
+    """
+    Fixed-capacity ring buffer of the latest OHLC bars for the live loop.
+
+    Every bar is written twice, at slot k and k + capacity, so the newest n
+    bars are always one contiguous slice: times()/hours()/ohlc() return
+    zero-copy views in time order. sync() fetches only the last few bars
+    from the source; when they do not overlap the window (bars were missed)
+    it backfills with doubling requests until they do. A bar with the same
+    time as the newest one replaces it (MT5's forming bar).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.count = 0
+        self.tz = None
+        self._time = np.zeros(2 * capacity, dtype=np.int64)  # ns since epoch (UTC)
+        self._hour = np.zeros(2 * capacity, dtype=np.int64)
+        self._ohlc = np.zeros((2 * capacity, len(OHLC_COLUMNS)))
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    # --- views ---
+
+    def _slice(self, n: int = None) -> slice:
+        n = len(self) if n is None else min(n, len(self))
+        end = self.capacity + self.count % self.capacity
+        return slice(end - n, end)
+
+    def times(self, n: int = None) -> np.ndarray:
+        return self._time[self._slice(n)]
+
+    def hours(self, n: int = None) -> np.ndarray:
+        return self._hour[self._slice(n)]
+
+    def ohlc(self, n: int = None) -> np.ndarray:
+        return self._ohlc[self._slice(n)]
+
+    def timestamp(self, ns: int) -> pd.Timestamp:
+        return pd.Timestamp(int(ns), unit="ns", tz="UTC").tz_convert(self.tz)
+
+    @property
+    def last_time(self):
+        return self.timestamp(self._time[self._slice(1)][0]) if self.count else None
+
+    def since(self, ts) -> int:
+        """Number of newest bars at or after ts (they are the last ones of every view)."""
+        times = self.times()
+        return len(times) - int(np.searchsorted(times, pd.Timestamp(ts).as_unit("ns").value, side="left"))
+
+    def frame(self, n: int = None) -> pd.DataFrame:
+        """The newest n bars as a DataFrame over the ohlc() view."""
+        index = pd.DatetimeIndex(self.times(n).view("M8[ns]")).tz_localize("UTC").tz_convert(self.tz)
+        return pd.DataFrame(self.ohlc(n), index=index.rename("time"), columns=OHLC_COLUMNS, copy=False)
+
+    # --- updates ---
+
+    def _write(self, slot: int, ns: int, hour: int, bar: np.ndarray):
+        for k in (slot, slot + self.capacity):
+            self._time[k] = ns
+            self._hour[k] = hour
+            self._ohlc[k] = bar
+
+    def push(self, df: pd.DataFrame) -> int:
+        """
+        Merge bars (oldest first): older than the newest bar are skipped, equal
+        replaces it, newer are appended. Returns how many bars are new.
+        """
+        if df is None or df.empty:
+            return 0
+        self.tz = self.tz or df.index.tz
+        times = df.index.as_unit("ns").asi8
+        hours = df.index.hour
+        values = df[OHLC_COLUMNS].to_numpy(dtype=float)
+        last = self._time[self._slice(1)][0] if self.count else None
+        added = 0
+        for ns, hour, bar in zip(times, hours, values):
+            if last is not None and ns < last:
+                continue
+            if last is not None and ns == last:
+                self._write((self.count - 1) % self.capacity, ns, hour, bar)
+                continue
+            self._write(self.count % self.capacity, ns, hour, bar)
+            self.count += 1
+            last = ns
+            added += 1
+        return added
+
+    def sync(self, source, symbol: str, timeframe: str, fetch: int = FETCH_BARS) -> int:
+        """
+        Pull bars newer than the window from source.get_bars(); the first
+        call fills the whole window. Returns how many bars are new.
+        """
+        if self.count == 0:
+            return self.push(source.get_bars(symbol, timeframe, n=self.capacity))
+
+        last = self._time[self._slice(1)][0]
+        n = fetch
+        while True:
+            df = source.get_bars(symbol, timeframe, n=n)
+            if df is None or df.empty:
+                return 0
+            # overlap with the window means nothing was skipped in between
+            if df.index[0].as_unit("ns").value <= last or n >= self.capacity:
+                return self.push(df)
+            n = min(2 * n, self.capacity)
@@ -1,18 +1,28 @@
 # live/live_trader.py
 
+import asyncio
 import time
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 from config import settings as cfg
-from features.pipeline import build_features
-from live.mt5_client import init_mt5, get_mt5_rates, get_bars
-from models.registry import generate_signals  # your existing function
+from features.pipeline import signal_columns
+from features.registry import required_lookback
+from features.streaming import StreamingFeatures
+from live.bar_source import get_bar_source
+from live.bar_window import BarWindow
+from models.registry import LiveScorer
 from models.live_loader import load_live_model
 from execution.broker import open_position, close_all_if_needed, check_open_positions  # you’ll wire these
-from utils.logging import log_event, log_margin_state, log_csv, low_conf_log_csv  # simple logger
+from utils.logging import log_event, log_margin_state, log_csv, low_conf_log_csv, flush_logs  # simple logger
 from execution.margin import compute_required_margin, margin_allowed
-from utils.sleeping import sleep_until_next_bar
+from execution.terminal import use_paper
+from utils.latency import LatencyMetrics
+from utils.timeframes import timeframe_seconds
+
+
+LATENCY_REPORT_BARS = 100  # bars between inference latency summaries
 
 
 def get_lookback_start(now: datetime, bars: int = 300):
@@ -21,132 +31,198 @@ def get_lookback_start(now: datetime, bars: int = 300):
     return now - delta
 
 
-def live_trading_loop():
-    init_mt5()
-    model, feature_cols = load_live_model()
-
-    last_bar_time = None
-
-    while True:
-        sleep_until_next_bar(5)
-        # now = datetime.utcnow()
-        # lookback_start = get_lookback_start(now)
-        #
-        # df_raw = get_mt5_rates(cfg.SYMBOL, cfg.TIMEFRAME, lookback_start, now)
-
-        df_raw = get_bars(cfg.SYMBOL, cfg.TIMEFRAME, n=300)
-
-        if df_raw is None or df_raw.empty:
-            # time.sleep(300)
-            continue
-
-        current_bar_time = df_raw.index[-1]
-
-        # Only act once per new M5 bar
-        if current_bar_time == last_bar_time:
-            # time.sleep(300)
-            continue
-
-        last_bar_time = current_bar_time
-
-        # Build features and generate signals on full window
-        df_feat, preds, conf = generate_signals(model, df_raw, feature_cols)
-
-
-        # Use last bar only
+class LiveTrader:
+    """
+    asyncio live runtime: one pass of feature -> inference -> risk -> order
+    stages per new bar.
+
+    On realtime sources the runtime polls the newest bar's time; when
+    nothing is new it sleeps until that bar should close (its open time plus
+    one period, so a broker server-time offset does not matter) and keeps
+    polling (LIVE_POLL_MIN, doubling up to LIVE_POLL_MAX) until the bar has
+    rolled, so a late broker bar is picked up as soon as it appears instead
+    of one cycle later. Replay sources keep their own pacing
+    (wait_for_next_bar) and trade on a PaperTerminal over the replayed bars,
+    so no MetaTrader 5 terminal is needed. Blocking terminal calls run one
+    at a time on a dedicated thread so the event loop keeps polling.
+
+    Every stage is timed into self.metrics (utils.latency), together with
+    detection -> order sent and, on realtime sources, bar close -> order
+    sent; the metrics file is refreshed every LATENCY_METRICS_EVERY bars and
+    a summary is printed on shutdown.
+    """
+
+    def __init__(self, source=None, symbol: str = cfg.SYMBOL, timeframe: str = cfg.TIMEFRAME):
+        self.source = source or get_bar_source()
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.period = timeframe_seconds(timeframe)
+        self.last_bar_time = None
+        self.engine = None
+        # sized in run() from the loaded model's columns
+        self.columns = self.lookback = self.window = None
+        self.terminal = ThreadPoolExecutor(1, thread_name_prefix="terminal")
+        self.model = self.scorer = None
+        self.metrics = LatencyMetrics()
+        self.bar_close = None  # expected close (epoch seconds) of the bar before the newest one (realtime sources)
+
+    async def call(self, fn, *args, **kwargs):
+        """Run a blocking terminal call off the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(self.terminal, lambda: fn(*args, **kwargs))
+
+    # --- bar detection ---
+
+    async def wait_for_bar(self):
+        """Detection time (perf_counter) of the next new bar, None when the source is exhausted."""
+        if not self.source.realtime:
+            if not await self.call(self.source.wait_for_next_bar, self.timeframe):
+                return None
+            return time.perf_counter()
+
+        # the newest bar closes one period after it opened, whatever the broker's
+        # server-time offset (H4/D1 bars are not aligned to the UTC epoch)
+        expected = self.last_bar_time.timestamp() + self.period if self.last_bar_time is not None else None
+        delay = None
+        while True:
+            latest = await self.call(self.source.latest_bar_time, self.symbol, self.timeframe)
+            if latest is not None and latest != self.last_bar_time:
+                self.bar_close = expected
+                return time.perf_counter()
+            if delay is None:
+                # nothing new yet: sleep to the expected close, then poll fast and back off
+                await asyncio.sleep(max(0.0, expected - time.time()) if expected is not None else cfg.LIVE_POLL_MAX)
+                delay = cfg.LIVE_POLL_MIN
+                continue
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, cfg.LIVE_POLL_MAX)
+
+    # --- stages ---
+
+    async def features(self):
+        """Feature frame of the newest bar, None while the engine warms up."""
+        with self.metrics.stage("get_bars"):
+            await self.call(self.window.sync, self.source, self.symbol, self.timeframe)
+        if len(self.window) == 0:
+            return None
+
+        current_bar_time = self.window.last_time
+        # Only act once per new bar
+        if current_bar_time == self.last_bar_time:
+            return None
+        self.last_bar_time = current_bar_time
+
+        # Update streaming features with the bars not seen yet; the last bar
+        # is still forming, so it is replaced on the next cycle.
+        # Reseed from the window when the engine fell behind it.
+        window = self.window
+        with self.metrics.stage("features"):
+            if self.engine is None or self.engine.last_time < window.timestamp(window.times()[0]):
+                self.engine = StreamingFeatures(required=self.columns)
+                n = len(window)
+            else:
+                n = window.since(self.engine.last_time)
+            self.engine.update_arrays([window.timestamp(ns) for ns in window.times(n)], window.hours(n),
+                                      window.ohlc(n))
+            if not self.engine.ready:
+                return None
+            return self.engine.frame()
+
+    async def infer(self, df_feat):
+        with self.metrics.stage("predict"):
+            last_pred, last_conf = self.scorer.score_row(self.engine.row)  # already decoded to -1, 0, 1
         last_idx = df_feat.index[-1]
-        last_conf = conf[-1]
-        last_pred = preds[-1]  # already decoded to -1, 0, 1
         last_atr_norm = df_feat["atr_norm"].iloc[-1]
 
-        print(f'{last_idx} | {last_pred} | {last_conf} | {last_atr_norm}')
+        print(f'{last_idx} | {last_pred} | {last_conf} | {last_atr_norm} | '
+              f'inference {self.scorer.latencies[-1] * 1000:.2f} ms')
+        if len(self.scorer.latencies) % LATENCY_REPORT_BARS == 0:
+            stats = self.scorer.latency_summary()
+            print(f"Inference latency over {stats['n']} bars: mean {stats['mean']:.2f} ms, "
+                  f"p50 {stats['p50']:.2f} ms, p99 {stats['p99']:.2f} ms, max {stats['max']:.2f} ms")
+        return last_idx, last_pred, last_conf, last_atr_norm
 
-        check_open_positions(last_pred, last_idx)
+    async def risk(self, last_idx, last_pred, last_conf, last_atr_norm):
+        """Position size for a new trade, None when a filter or the margin check blocks it."""
+        with self.metrics.stage("check_open_positions"):
+            await self.call(check_open_positions, last_pred, last_idx)
 
         # Safety: close all if margin / risk breached
         # close_all_if_needed()
 
         # Filters (use baseline params)
         if last_conf < cfg.CONF_THRESHOLD:
-            # log_event(f"{last_idx} | No trade: low confidence {last_conf:.3f}")
             low_conf_log_csv(
                 "NO_TRADE_LOW_CONF",
                 bar_time=str(last_idx),
                 confidence=last_conf,
             )
-
-            continue
+            return None
 
         if last_atr_norm < cfg.ATR_NORM_THRESHOLD:
-            # log_event(f"{last_idx} | No trade: low ATR_norm {last_atr_norm:.6f}")
             low_conf_log_csv(
                 "NO_TRADE_LOW_ATR",
                 bar_time=str(last_idx),
                 atr_norm=last_atr_norm,
             )
-
-            continue
+            return None
 
         # Direction: -1 short, 1 long, 0 no trade
         direction = last_pred
         if direction == 0:
-            # log_event(f"{last_idx} | No trade: neutral signal")
             low_conf_log_csv(
                 "NO_TRADE_NEUTRAL",
                 bar_time=str(last_idx),
             )
-
-            continue
+            return None
 
         # Position sizing (simple fixed size for now)
         volume = cfg.POSITION_SIZE
 
         # Margin check
-        required_margin = compute_required_margin(cfg.SYMBOL, direction, volume)
+        with self.metrics.stage("compute_required_margin"):
+            required_margin = await self.call(compute_required_margin, self.symbol, direction, volume)
 
         if required_margin is None:
-            # log_event(f"{last_idx} | Cannot compute margin — skipping trade")
             low_conf_log_csv(
                 "CAN_NOT_COMPUTE_MARGIN",
                 bar_time=str(last_idx),
             )
-            continue
+            return None
 
-        log_margin_state(f"{last_idx}", direction, required_margin)
+        with self.metrics.stage("log_margin_state"):
+            log_margin_state(f"{last_idx}", direction, required_margin)
 
-        if not margin_allowed(required_margin, direction, cfg.MARGIN_LIMIT):
-            # log_event(
-            #     f"{last_idx} | Trade blocked: required margin {required_margin:.2f} "
-            #     f"exceeds allowed {cfg.MARGIN_LIMIT * 100:.0f}% of equity"
-            # )
+        with self.metrics.stage("margin_allowed"):
+            allowed = await self.call(margin_allowed, required_margin, direction, cfg.MARGIN_LIMIT)
+        if not allowed:
             low_conf_log_csv(
                 "TRADE_BLOCKED_MARGIN",
                 bar_time=str(last_idx),
                 direction="LONG" if direction == 1 else "SHORT",
                 required_margin=required_margin,
             )
+            return None
 
-            continue
+        return volume
 
+    async def order(self, df_feat, last_idx, direction, last_conf, last_atr_norm, volume):
         # SL/TP in price terms (you already use ATR in backtest)
         atr = df_feat["atr"].iloc[-1]
         sl_dist = cfg.SL_MULT * atr
         tp_dist = cfg.TP_MULT * atr
 
-        open_position(
-            symbol=cfg.SYMBOL,
-            direction=direction,
-            volume=volume,
-            sl_distance=sl_dist,
-            tp_distance=tp_dist,
-            conf=last_conf,
-        )
+        # order round trip: request sent until the terminal returns the result
+        with self.metrics.stage("order_send"):
+            await self.call(
+                open_position,
+                symbol=self.symbol,
+                direction=direction,
+                volume=volume,
+                sl_distance=sl_dist,
+                tp_distance=tp_dist,
+                conf=last_conf,
+            )
 
-        # log_event(
-        #     f"{last_idx} | OPEN {('LONG' if direction == 1 else 'SHORT')} "
-        #     f"conf={last_conf:.3f}, atr_norm={last_atr_norm:.6f}, "
-        #     f"SL={sl_dist:.5f}, TP={tp_dist:.5f}"
-        # )
         log_csv(
             "OPEN_TRADE",
             bar_time=str(last_idx),
@@ -158,5 +234,48 @@ def live_trading_loop():
             volume=volume,
         )
 
-        # Small sleep to avoid hammering MT5
-        # time.sleep(300)
+    # --- main loop ---
+
+    async def on_bar(self, detected: float):
+        df_feat = await self.features()
+        if df_feat is None:
+            return
+        self.metrics.tick()
+        last_idx, last_pred, last_conf, last_atr_norm = await self.infer(df_feat)
+        volume = await self.risk(last_idx, last_pred, last_conf, last_atr_norm)
+        if volume is None:
+            self.metrics.record("detect_to_decision", time.perf_counter() - detected)
+            return
+        await self.order(df_feat, last_idx, last_pred, last_conf, last_atr_norm, volume)
+        sent = time.perf_counter() - detected
+        self.metrics.record("detect_to_order", sent)
+        if self.source.realtime and self.bar_close is not None:
+            self.metrics.record("bar_close_to_order", time.time() - self.bar_close)
+        print(f"{last_idx} | order sent {sent * 1000:.1f} ms after the bar appeared")
+
+    async def run(self):
+        await self.call(self.source.init)
+        if not self.source.realtime:
+            use_paper(self.source, self.symbol, self.timeframe)
+        self.model, feature_cols = await self.call(load_live_model)
+        # seed with enough bars for the model's features and the ATR the filters and SL/TP read;
+        # only bars newer than the window are fetched each cycle
+        self.columns = signal_columns(feature_cols)
+        self.lookback = required_lookback(self.columns)
+        self.window = BarWindow(self.lookback)
+        # scores the streaming engine's last row directly, no per-bar frame for the model
+        self.scorer = LiveScorer(self.model, feature_cols, StreamingFeatures.columns)
+        try:
+            while True:
+                detected = await self.wait_for_bar()
+                if detected is None:
+                    break
+                await self.on_bar(detected)
+        finally:
+            self.terminal.shutdown(wait=False)
+            self.metrics.close()
+            flush_logs()
+
+
+def live_trading_loop(source=None):
+    asyncio.run(LiveTrader(source).run())
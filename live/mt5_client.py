@@ -4,6 +4,17 @@ import MetaTrader5 as mt5
 import pandas as pd
 
 from config.settings import LOCAL_TZ
+from live.bar_store import BarStore, rates_to_frame
+
+TIMEFRAME_MAP = {
+    "M1": mt5.TIMEFRAME_M1,
+    "M5": mt5.TIMEFRAME_M5,
+    "M15": mt5.TIMEFRAME_M15,
+    "M30": mt5.TIMEFRAME_M30,
+    "H1": mt5.TIMEFRAME_H1,
+    "H4": mt5.TIMEFRAME_H4,
+    "D1": mt5.TIMEFRAME_D1
+}
 
 
 def init_mt5(login=None, password=None, server=None):
@@ -17,58 +28,37 @@ def init_mt5(login=None, password=None, server=None):
     print("MT5 initialized")
 
 
-def get_mt5_rates(symbol: str, timeframe, start_date, end_date, days=None) -> pd.DataFrame:
+def get_mt5_rates(symbol: str, timeframe, start_date, end_date, days=None, use_store=True) -> pd.DataFrame:
     # init_mt5()
     # utc_to = datetime.utcnow()
     # utc_from = utc_to - timedelta(days=days)
 
-    timeframe_map = {
-        "M1": mt5.TIMEFRAME_M1,
-        "M5": mt5.TIMEFRAME_M5,
-        "M15": mt5.TIMEFRAME_M15,
-        "M30": mt5.TIMEFRAME_M30,
-        "H1": mt5.TIMEFRAME_H1,
-        "H4": mt5.TIMEFRAME_H4,
-        "D1": mt5.TIMEFRAME_D1
-    }
-
-    tf = timeframe_map.get(timeframe)
+    tf = TIMEFRAME_MAP.get(timeframe)
     if tf is None:
         raise ValueError(f"Unsupported timeframe: {timeframe}")
 
     # --- NEW LOGIC --- # If start_date and end_date are provided → use them
-    if start_date is not None and end_date is not None:
-        rates = mt5.copy_rates_range(symbol, tf, start_date, end_date)
-    else:
+    if start_date is None or end_date is None:
         if days is None:
             raise ValueError("Either days or (start_date and end_date) must be provided.")
-        utc_to = datetime.utcnow()
-        utc_from = utc_to - timedelta(days=days)
-        rates = mt5.copy_rates_range(symbol, tf, utc_from, utc_to)
+        end_date = datetime.utcnow()
+        start_date = end_date - timedelta(days=days)
+
+    if use_store:
+        # Serve from the local bar store, downloading only ranges not seen before
+        store = BarStore(symbol, timeframe)
+        rates = store.fetch(start_date, end_date,
+                            lambda date_from, date_to: mt5.copy_rates_range(symbol, tf, date_from, date_to))
+    else:
+        rates = mt5.copy_rates_range(symbol, tf, start_date, end_date)
     if rates is None or len(rates) == 0:
         raise RuntimeError(f"Failed to load data for {symbol}: {mt5.last_error()}")
 
-    df = pd.DataFrame(rates)
-    df['time'] = pd.to_datetime(df['time'], unit='s')
-    df.set_index('time', inplace=True)
-    df.index = df.index.tz_localize('UTC').tz_convert(LOCAL_TZ)
-    df = df[["open", "high", "low", "close"]]
-
-    return df
+    return rates_to_frame(rates)
 
 
 def get_bars(symbol: str, timeframe: str, n: int = 500) -> pd.DataFrame:
-    timeframe_map = {
-        "M1": mt5.TIMEFRAME_M1,
-        "M5": mt5.TIMEFRAME_M5,
-        "M15": mt5.TIMEFRAME_M15,
-        "M30": mt5.TIMEFRAME_M30,
-        "H1": mt5.TIMEFRAME_H1,
-        "H4": mt5.TIMEFRAME_H4,
-        "D1": mt5.TIMEFRAME_D1
-    }
-
-    tf = timeframe_map.get(timeframe)
+    tf = TIMEFRAME_MAP.get(timeframe)
     if tf is None:
         raise ValueError(f"Unsupported timeframe: {timeframe}")
 
@@ -92,6 +82,16 @@ def get_bars(symbol: str, timeframe: str, n: int = 500) -> pd.DataFrame:
     return df[["open", "high", "low", "close"]]
 
 
+def get_latest_bar_time(symbol: str, timeframe: str):
+    """Open time of the newest (forming) bar, localized like get_bars(); None when unavailable."""
+    tf = TIMEFRAME_MAP.get(timeframe)
+    if tf is None:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    rates = mt5.copy_rates_from_pos(symbol, tf, 0, 1)
+    if rates is None or len(rates) == 0:
+        return None
+    return pd.Timestamp(int(rates["time"][-1]), unit="s").tz_localize(LOCAL_TZ)
+
 
 def place_order(symbol, direction, volume, sl, tp):
     # TODO: implement order_send
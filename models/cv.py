@@ -0,0 +1,133 @@
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import balanced_accuracy_score
+
+from config import settings as cfg
+from models.registry import predict_signals
+
+
+def embargo_bars(horizon: int, mult: float = cfg.CV_EMBARGO_MULT) -> int:
+    return int(math.ceil(horizon * mult))
+
+
+def purged_split(n: int, horizon: int, val_ratio: float = cfg.VALIDATION_RATIO):
+    """
+    Single time-ordered split whose training part stops horizon rows before
+    the validation part: those rows' labels look into the validation window.
+    """
+    split_idx = int(n * (1 - val_ratio))
+    return np.arange(max(0, split_idx - horizon)), np.arange(split_idx, n)
+
+
+def purged_kfold(n: int, horizon: int, n_splits: int = cfg.CV_FOLDS, embargo: int = None) -> list:
+    """
+    K contiguous test blocks in time order; each fold trains on every other
+    row except
+
+      - the horizon rows before the block (purge: their labels are computed
+        from bars inside it),
+      - the embargo rows after it (their features overlap the block's labels,
+        default embargo_bars(horizon)).
+
+    Returns a list of (train_idx, test_idx) position arrays.
+    """
+    if n_splits < 2:
+        raise ValueError(f"Purged k-fold needs at least 2 splits, got {n_splits}")
+    embargo = embargo_bars(horizon) if embargo is None else embargo
+    bounds = np.linspace(0, n, n_splits + 1).astype(int)
+    folds = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        train = np.concatenate([np.arange(0, max(0, start - horizon)),
+                                np.arange(min(n, end + embargo), n)])
+        folds.append((train, np.arange(start, end)))
+    return folds
+
+
+def _evaluate_fold(k: int, make_model, X, y, df_feat, train_idx, test_idx, horizon, score_fn, n_jobs) -> dict:
+    X_test, y_test = X.iloc[test_idx], y.iloc[test_idx]
+
+    model = make_model(n_jobs)
+    if getattr(model, "early_stopping_rounds", None):
+        # stop on the tail of the fold's own training rows (purged like any
+        # validation split), the test block only scores the model
+        fit_pos, stop_pos = purged_split(len(train_idx), horizon)
+        fit_idx, stop_idx = train_idx[fit_pos], train_idx[stop_pos]
+        model.fit(X.iloc[fit_idx], y.iloc[fit_idx], eval_set=[(X.iloc[stop_idx], y.iloc[stop_idx])], verbose=False)
+    else:
+        model.fit(X.iloc[train_idx], y.iloc[train_idx])
+
+    signals, conf = predict_signals(model, X_test)
+    result = {
+        "fold": k,
+        "train_rows": len(train_idx),
+        "test_rows": len(test_idx),
+        "balanced_accuracy": balanced_accuracy_score(y_test, model.predict(X_test)),
+        "best_iteration": getattr(model, "best_iteration", None),
+        "score": None,
+    }
+    if score_fn is not None:
+        result["score"] = score_fn(df_feat.loc[X_test.index], np.asarray(signals), np.asarray(conf))
+    return result
+
+
+def cross_validate(make_model, X: pd.DataFrame, y: pd.Series, horizon: int, df_feat: pd.DataFrame = None,
+                   score_fn=None, n_splits: int = cfg.CV_FOLDS, embargo: int = None,
+                   n_workers: int = None, threads: int = None, on_fold=None) -> dict:
+    """
+    Purged, embargoed k-fold CV of make_model(n_jobs) -> unfitted classifier.
+
+    Folds run on a thread pool over the same X/y/df_feat (XGBoost releases
+    the GIL while boosting, so nothing is copied or pickled) and split the
+    XGBoost thread budget (threads, default all cores) between them. Models
+    with early_stopping_rounds stop on a purged_split() tail of their fold's
+    training rows, never on the test block.
+
+    score_fn(df_feat_test, signals, conf) backtests a fold's predictions and
+    may return a float or an array (one score per parameter set); it is
+    averaged over folds. on_fold(result, done) is called in the calling
+    thread as folds finish and may raise to cancel the rest.
+
+    Returns mean/std of balanced accuracy and score plus the per-fold results
+    (with each fold's best_iteration when early stopping was used).
+    """
+    n_workers = n_workers or cfg.CV_WORKERS
+    n_jobs = max(1, (threads or os.cpu_count() or 1) // n_workers)
+    folds = purged_kfold(len(X), horizon, n_splits, embargo)
+
+    results = []
+    pool = ThreadPoolExecutor(n_workers)
+    try:
+        futures = [pool.submit(_evaluate_fold, k, make_model, X, y, df_feat, train, test, horizon, score_fn, n_jobs)
+                   for k, (train, test) in enumerate(folds)]
+        for future in as_completed(futures):
+            results.append(future.result())
+            if on_fold is not None:
+                on_fold(results[-1], len(results))
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+    results.sort(key=lambda r: r["fold"])
+    accuracy = np.array([r["balanced_accuracy"] for r in results])
+    summary = {
+        "balanced_accuracy_mean": float(accuracy.mean()),
+        "balanced_accuracy_std": float(accuracy.std()),
+        "score_mean": None,
+        "score_std": None,
+        "folds": results,
+    }
+    if score_fn is not None:
+        scores = np.array([r["score"] for r in results], dtype=np.float64)
+        summary["score_mean"] = scores.mean(axis=0)
+        summary["score_std"] = scores.std(axis=0)
+    return summary
+
+
+def print_cv_summary(summary: dict):
+    print(f"Purged CV ({len(summary['folds'])} folds): balanced accuracy "
+          f"{summary['balanced_accuracy_mean']:.4f} ± {summary['balanced_accuracy_std']:.4f}")
+    if summary["score_mean"] is not None and np.ndim(summary["score_mean"]) == 0:
+        print(f"  backtest score {summary['score_mean']:.4f} ± {summary['score_std']:.4f}")
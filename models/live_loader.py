@@ -1,7 +1,22 @@
-import joblib
+import os
+import time
 
+from models.model_store import ModelRegistry
 
-def load_live_model():
-    model = joblib.load("models/saved/baseline_model.pkl")
-    feature_cols = joblib.load("models/saved/feature_cols.pkl")
+LEGACY_MODEL_PATH = "models/saved/baseline_model.pkl"
+LEGACY_FEATURES_PATH = "models/saved/feature_cols.pkl"
+
+
+def load_live_model(version: str = None):
+    """Pinned (else latest) registry model, or a pickle from before the registry existed."""
+    registry = ModelRegistry()
+    if version is None and registry.live_version() is None and os.path.exists(LEGACY_MODEL_PATH):
+        import joblib
+        print(f"Model registry is empty, loading legacy {LEGACY_MODEL_PATH}")
+        return joblib.load(LEGACY_MODEL_PATH), joblib.load(LEGACY_FEATURES_PATH)
+
+    t0 = time.perf_counter()
+    model, feature_cols, meta = registry.load(version)
+    print(f"Loaded model {meta['version']} (horizon {meta['horizon']}, trained on "
+          f"{meta['data_start']} .. {meta['data_end']}) in {(time.perf_counter() - t0) * 1000:.0f} ms")
     return model, feature_cols
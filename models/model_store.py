@@ -0,0 +1,162 @@
+# models/model_store.py
+
+import json
+import os
+from datetime import datetime, timezone
+
+import xgboost
+from xgboost import XGBClassifier
+
+from config import settings as cfg
+from models.signal_cache import SignalCache, model_key
+
+MODEL_FILE = "model.ubj"  # XGBoost's native binary (UBJSON) format
+META_FILE = "meta.json"
+
+
+class ModelRegistry:
+    """
+    Versioned models for one symbol/timeframe under cfg.MODEL_REGISTRY_DIR.
+
+    Every save() adds a directory v0001, v0002, ... holding the model in
+    XGBoost's native format next to meta.json (feature columns, params,
+    horizon, barriers, data range, metrics). registry.json records the
+    pinned version and retired ones; live trading loads the pinned one,
+    else the latest version not retired. Retiring a version also drops its
+    cached predictions.
+    """
+
+    def __init__(self, symbol: str = cfg.SYMBOL, timeframe: str = cfg.TIMEFRAME,
+                 root: str = cfg.MODEL_REGISTRY_DIR):
+        safe_symbol = "".join(c if c.isalnum() else "_" for c in symbol).strip("_")
+        self.dir = os.path.join(root, f"{safe_symbol}_{timeframe}")
+        self.index_path = os.path.join(self.dir, "registry.json")
+
+    # --- persistence ---
+
+    def _index(self) -> dict:
+        if not os.path.exists(self.index_path):
+            return {"pinned": None, "retired": []}
+        with open(self.index_path, "r") as f:
+            return json.load(f)
+
+    def _write_index(self, index: dict):
+        os.makedirs(self.dir, exist_ok=True)
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(index, f, indent=4)
+        os.replace(tmp, self.index_path)
+
+    def _new_version_dir(self):
+        os.makedirs(self.dir, exist_ok=True)
+        number = len(self.versions()) + 1
+        while True:
+            version = f"v{number:04d}"
+            try:
+                # exist_ok=False: concurrent trainers never share a version
+                os.makedirs(os.path.join(self.dir, version))
+                return version
+            except FileExistsError:
+                number += 1
+
+    def save(self, model: XGBClassifier, feature_cols, params: dict, horizon: int, data_start, data_end,
+             metrics: dict = None, **extra) -> str:
+        """Store a fitted model with its metadata as a new version, returns the version."""
+        version = self._new_version_dir()
+        path = os.path.join(self.dir, version)
+        model.save_model(os.path.join(path, MODEL_FILE))
+        meta = {
+            "version": version,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "xgboost": xgboost.__version__,
+            "feature_cols": list(feature_cols),
+            "params": params,
+            "horizon": horizon,
+            "target_type": cfg.TARGET_TYPE,
+            "data_start": str(data_start),
+            "data_end": str(data_end),
+            "metrics": metrics or {},
+            "model_key": model_key(model),
+            **extra,
+        }
+        with open(os.path.join(path, META_FILE), "w") as f:
+            json.dump(meta, f, indent=4, default=str)
+        return version
+
+    # --- queries ---
+
+    def versions(self) -> list:
+        """Metadata of every stored version, oldest first."""
+        if not os.path.isdir(self.dir):
+            return []
+        metas = []
+        for name in sorted(os.listdir(self.dir)):
+            meta_path = os.path.join(self.dir, name, META_FILE)
+            if os.path.exists(meta_path):  # skips a version still being written
+                with open(meta_path, "r") as f:
+                    metas.append(json.load(f))
+        return metas
+
+    def meta(self, version: str) -> dict:
+        with open(os.path.join(self.dir, version, META_FILE), "r") as f:
+            return json.load(f)
+
+    def pinned(self):
+        return self._index()["pinned"]
+
+    def retired(self) -> list:
+        return self._index().get("retired", [])
+
+    def live_version(self):
+        """The pinned version, else the latest one not retired, None when there is none."""
+        retired = self.retired()
+        versions = [m["version"] for m in self.versions() if m["version"] not in retired]
+        return self.pinned() or (versions[-1] if versions else None)
+
+    # --- pinning ---
+
+    def pin(self, version: str):
+        if not os.path.exists(os.path.join(self.dir, version, META_FILE)):
+            raise ValueError(f"Unknown model version: {version}")
+        index = self._index()
+        # pinning brings a retired version back
+        index["retired"] = [v for v in index.get("retired", []) if v != version]
+        self._write_index({**index, "pinned": version})
+
+    def unpin(self):
+        self._write_index({**self._index(), "pinned": None})
+
+    def retire(self, version: str) -> int:
+        """Exclude version from live use (unpinning it) and evict its cached predictions."""
+        key = self.meta(version).get("model_key") or model_key(self.load(version)[0])
+        index = self._index()
+        index["retired"] = sorted(set(index.get("retired", [])) | {version})
+        if index["pinned"] == version:
+            index["pinned"] = None
+        self._write_index(index)
+        return SignalCache().evict_model(key)
+
+    # --- loading ---
+
+    def load(self, version: str = None):
+        """(model, feature_cols, meta) of version, default live_version()."""
+        version = version or self.live_version()
+        if version is None:
+            raise FileNotFoundError(f"No models stored in {self.dir}")
+        meta = self.meta(version)
+        model = XGBClassifier()
+        model.load_model(os.path.join(self.dir, version, MODEL_FILE))
+        return model, meta["feature_cols"], meta
+
+
+def print_versions(registry: ModelRegistry = None):
+    registry = registry or ModelRegistry()
+    pinned = registry.pinned()
+    live = registry.live_version()
+    retired = registry.retired()
+    for meta in registry.versions():
+        mark = ("pinned" if meta["version"] == pinned else "live" if meta["version"] == live
+                else "retired" if meta["version"] in retired else "")
+        metrics = ", ".join(f"{k}={v:.4f}" for k, v in meta["metrics"].items())
+        print(f"{meta['version']}  {meta['created']}  h={meta['horizon']}  "
+              f"{meta['data_start']} .. {meta['data_end']}  {metrics}  {mark}")
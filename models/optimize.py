@@ -1,31 +1,101 @@
 import optuna
 import numpy as np
 import pandas as pd
+import hashlib
+import itertools
 import json
 import os
+import statistics
+from concurrent.futures import ProcessPoolExecutor
 
 from config import settings as cfg
-from features.pipeline import build_features
-from labeling.targets import add_directional_target
-from live.mt5_client import get_mt5_rates, init_mt5
+from features.pipeline import FEATURE_COLUMNS, FEATURE_SET_VERSION, build_features
+from labeling.targets import build_label_matrix, build_target
+from live.bar_source import get_bar_source
 from models.train import XGBClassifier  # or import from your train module
+import xgboost as xgb
 from models.registry import generate_signals
+from models.cv import cross_validate, purged_split
 from backtesting.engine import backtest_hedging
+from backtesting.grid import backtest_grid
+from backtesting.metrics import sharpe_ratio
+from utils.shared_frame import SharedFrame, rss_mb
+
+# set once per process (see _init_worker): data shared by every trial, XGBoost threads per model
+_TRAIN_FEATURES = None
+_TRAIN_LABELS = None
+_XGB_THREADS = None
+_SHARED = []
+
+
+def _init_worker(data: dict, xgb_threads: int = None):
+    """
+    data maps "features"/"labels" to frames (same process) or SharedFrame
+    handles (worker processes, attached zero-copy).
+    """
+    global _TRAIN_FEATURES, _TRAIN_LABELS, _XGB_THREADS
+    frames = {}
+    for name, item in data.items():
+        if isinstance(item, dict):
+            shared = SharedFrame.attach(item)
+            _SHARED.append(shared)
+            item = shared.frame()
+        frames[name] = item
+    _TRAIN_FEATURES = frames["features"]
+    _TRAIN_LABELS = frames.get("labels")
+    _XGB_THREADS = xgb_threads
+
+
+def _prepare_train_data(df_raw: pd.DataFrame) -> dict:
+    """Feature base (and direction labels for every horizon) built once per run."""
+    data = {"features": build_features(df_raw, use_cache=True)}
+    if cfg.TARGET_TYPE == "direction":
+        data["labels"] = build_label_matrix(data["features"], use_cache=True)
+    return data
+
+
+def _memory_report() -> dict:
+    frames = {"features": _TRAIN_FEATURES, "labels": _TRAIN_LABELS}
+    zero_copy = all(any(shared.shares(df) for shared in _SHARED)
+                    for df in frames.values() if df is not None)
+    return {"pid": os.getpid(), "rss_mb": rss_mb(), "zero_copy": bool(_SHARED) and zero_copy}
+
+
+def _load_train_data() -> pd.DataFrame:
+    # TRAIN window only
+    train_start = pd.to_datetime(cfg.TRAIN_START)
+    train_end = pd.to_datetime(cfg.TRAIN_END)
+    return get_bar_source().get_rates(cfg.SYMBOL, cfg.TIMEFRAME, train_start, train_end)
+
+
+# intermediate value steps: boosting rounds report -mlogloss at their round number,
+# the partial-window backtest reports its score at this step (beyond any round)
+PARTIAL_BACKTEST_STEP = 10_000
+
 
+class _PruningCallback(xgb.callback.TrainingCallback):
+    """Reports -mlogloss on the early-stopping split every PRUNE_CHECKPOINT rounds and prunes hopeless trials."""
 
-def _train_model_with_params(df_train: pd.DataFrame, params: dict):
-    df_feat = build_features(df_train)
-    df_lab = add_directional_target(df_feat, horizon=params["horizon"])
+    def __init__(self, trial: optuna.Trial, every: int = cfg.PRUNE_CHECKPOINT):
+        self.trial = trial
+        self.every = every
 
-    X = df_lab.drop(columns=["target", "target_raw", "future_ret"])
-    y = df_lab["target"]
+    def __deepcopy__(self, memo):
+        # XGBoost copies callbacks before training; the trial must stay the live one
+        return self
 
-    # no shuffle: keep time order
-    split_idx = int(len(X) * (1 - cfg.VALIDATION_RATIO))
-    X_train, X_val = X.iloc[:split_idx], X.iloc[split_idx:]
-    y_train, y_val = y.iloc[:split_idx], y.iloc[split_idx:]
+    def after_iteration(self, model, epoch, evals_log):
+        rounds = epoch + 1
+        if rounds % self.every == 0:
+            loss = evals_log["validation_0"]["mlogloss"][-1]
+            self.trial.report(-loss, step=rounds)
+            if self.trial.should_prune():
+                raise optuna.TrialPruned(f"validation mlogloss {loss:.4f} after {rounds} rounds")
+        return False
 
-    model = XGBClassifier(
+
+def _make_model(params: dict, n_jobs: int = None, callbacks: list = None) -> XGBClassifier:
+    return XGBClassifier(
         max_depth=params["max_depth"],
         learning_rate=params["learning_rate"],
         n_estimators=params["n_estimators"],
@@ -35,34 +105,50 @@ def _train_model_with_params(df_train: pd.DataFrame, params: dict):
         gamma=params["gamma"],
         objective="multi:softprob",
         num_class=3,
+        n_jobs=n_jobs,
+        eval_metric="mlogloss",
+        early_stopping_rounds=cfg.EARLY_STOPPING_ROUNDS,
+        callbacks=callbacks,
     )
-    model.fit(X_train, y_train)
 
-    return model, X.columns, df_feat.iloc[split_idx:]  # features aligned with val part
 
+def _train_model_with_params(df_train: pd.DataFrame, params: dict, trial: optuna.Trial = None, labels=None):
+    df_feat = build_features(df_train, use_cache=True)
+    # direction targets: every horizon of the search range is labeled once, trials pick a column
+    X, y = build_target(df_feat, params["horizon"], sl_mult=params.get("sl_mult", cfg.SL_MULT),
+                        tp_mult=params.get("tp_mult", cfg.TP_MULT), use_cache=True, labels=labels)
 
-def _compute_sharpe(equity_df: pd.DataFrame) -> float:
-    equity_df = equity_df.copy()
-    equity_df["returns"] = equity_df["equity"].pct_change()
-    ret = equity_df["returns"].dropna()
+    # no shuffle: keep time order, purge the rows whose labels look into the validation part
+    train_idx, val_idx = purged_split(len(X), params["horizon"])
+    # early stopping on a purged tail of the training rows, the validation
+    # part only scores the model (as in models/cv.py)
+    fit_pos, stop_pos = purged_split(len(train_idx), params["horizon"])
+    fit_idx, stop_idx = train_idx[fit_pos], train_idx[stop_pos]
+    X_val = X.iloc[val_idx]
 
-    if ret.std() == 0 or len(ret) < 10:
-        return 0.0
+    model = _make_model(params, _XGB_THREADS, [_PruningCallback(trial)] if trial is not None else None)
+    model.fit(X.iloc[fit_idx], y.iloc[fit_idx], eval_set=[(X.iloc[stop_idx], y.iloc[stop_idx])], verbose=False)
+    if trial is not None:
+        trial.set_user_attr("best_iteration", int(model.best_iteration))
 
-    periods_per_year = 288 * 252  # M5 bars
-    sharpe = (ret.mean() / ret.std()) * np.sqrt(periods_per_year)
-    return float(sharpe)
+    return model, X.columns, df_feat.loc[X_val.index]  # features aligned with val part
 
 
-def objective(trial: optuna.Trial) -> float:
-    # 1) Load TRAIN window only
+def _compute_sharpe(equity_df: pd.DataFrame) -> float:
+    return sharpe_ratio(equity_df["equity"])
 
-    train_start = pd.to_datetime(cfg.TRAIN_START)
-    train_end = pd.to_datetime(cfg.TRAIN_END)
-    df_raw = get_mt5_rates(cfg.SYMBOL, cfg.TIMEFRAME, train_start, train_end)
 
-    # 2) Suggest parameters (no indicators here)
-    params = {
+# execution parameters swept by the nested mode on each model's cached predictions
+EXEC_GRID = {
+    "sl_mult": [1.0, 1.5, 2.0, 2.5],
+    "tp_mult": [1.5, 2.0, 2.5, 3.0, 3.5],
+    "conf_threshold": [0.50, 0.55, 0.60, 0.65, 0.70, 0.80],
+    "atr_norm_threshold": [0.0003, 0.0005, 0.0008, 0.0012, 0.0020],
+}
+
+
+def _suggest_model_params(trial: optuna.Trial) -> dict:
+    return {
         # model
         "max_depth": trial.suggest_int("max_depth", 3, 10),
         "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.2, log=True),
@@ -73,24 +159,65 @@ def objective(trial: optuna.Trial) -> float:
         "gamma": trial.suggest_float("gamma", 0.0, 5.0),
 
         # target horizon
-        "horizon": trial.suggest_int("horizon", 6, 24),
+        "horizon": trial.suggest_int("horizon", *cfg.HORIZON_RANGE),
+    }
 
-        # execution / thresholds
+
+def _suggest_barriers(trial: optuna.Trial) -> dict:
+    return {
         "sl_mult": trial.suggest_float("sl_mult", 1.0, 2.5),
         "tp_mult": trial.suggest_float("tp_mult", 1.5, 3.5),
+    }
+
+
+def _suggest_thresholds(trial: optuna.Trial) -> dict:
+    return {
         "conf_threshold": trial.suggest_float("conf_threshold", 0.50, 0.80),
         "atr_norm_threshold": trial.suggest_float("atr_norm_threshold", 0.0003, 0.0020),
     }
 
-    # 3) Train model on early part of TRAIN, validate on late part of TRAIN
-    model, feature_cols, df_val_feat = _train_model_with_params(df_raw, params)
 
-    # 4) Generate signals on validation slice
-    df_feat_val, signals_val, conf_val = generate_signals(
-        model, df_val_feat, feature_cols
-    )
+def _score(final_balance, sharpe, n_trades) -> float:
+    # If no trades → return a very bad score
+    if n_trades == 0:
+        return -1e6
+
+    # Normalize PnL to avoid huge scale differences
+    pnl_norm = (final_balance - cfg.INITIAL_BALANCE) / cfg.INITIAL_BALANCE
+
+    # Combined objective
+    objective_value = sharpe * pnl_norm
+
+    # Penalize too few trades
+    if n_trades < 50:
+        objective_value *= 0.5
+
+    return objective_value
+
+
+def _validation_signals(params: dict, trial: optuna.Trial = None):
+    # 1) TRAIN window features, built once per run
+    if _TRAIN_FEATURES is None:
+        _init_worker(_prepare_train_data(_load_train_data()))
+
+    # 2) Train model on early part of TRAIN, validate on late part of TRAIN
+    model, feature_cols, df_val_feat = _train_model_with_params(_TRAIN_FEATURES, params, trial, _TRAIN_LABELS)
 
-    # 5) Backtest on validation slice only (still inside TRAIN window)
+    # 3) Generate signals on validation slice
+    return generate_signals(model, df_val_feat, feature_cols)
+
+
+def _prune_on_partial(trial: optuna.Trial, score_fn, df_feat_val, signals_val, conf_val):
+    """Score the first PRUNE_PARTIAL_FRACTION of the validation window and let the pruner decide."""
+    n = int(len(df_feat_val) * cfg.PRUNE_PARTIAL_FRACTION)
+    score = score_fn(df_feat_val.iloc[:n], signals_val[:n], conf_val[:n])
+    trial.report(score, step=PARTIAL_BACKTEST_STEP)
+    if trial.should_prune():
+        raise optuna.TrialPruned(f"partial backtest score {score:.4f}")
+
+
+def _backtest_score(params: dict, df_feat_val, signals_val, conf_val) -> float:
+    # Backtest on validation slice only (still inside TRAIN window)
     final_balance, equity_df, trades_df = backtest_hedging(
         df_feat_val,
         signals_val,
@@ -105,45 +232,309 @@ def objective(trial: optuna.Trial) -> float:
         lev=20,
         marg_limit=0.5,
     )
-    # If no equity points or no trades → return a very bad score
-    if equity_df is None or len(equity_df) == 0 or len(trades_df) == 0:
-        return -1e6  # or any very low number
+    if equity_df is None or len(equity_df) == 0:
+        return -1e6
 
-    # 6) Use Sharpe on validation as objective
-    sharpe = _compute_sharpe(equity_df)
-    pnl = final_balance - cfg.INITIAL_BALANCE
+    # Use Sharpe on validation as objective
+    return _score(final_balance, _compute_sharpe(equity_df), len(trades_df))
 
-    # Normalize PnL to avoid huge scale differences
-    pnl_norm = pnl / cfg.INITIAL_BALANCE
 
-    # Combined objective
-    objective_value = sharpe * pnl_norm
+def _grid_scores(sets: list, df_feat_val, signals_val, conf_val) -> np.ndarray:
+    results = backtest_grid(
+        df_feat_val,
+        signals_val,
+        conf_val,
+        sets,
+        initial_balance=cfg.INITIAL_BALANCE,
+        position_size=cfg.POSITION_SIZE,
+        contr_size=1,
+        lev=20,
+    )
+    return np.array([_score(r.final_balance, r.sharpe, r.n_trades) for r in results.itertuples()])
 
-    # Penalize too few trades
-    if len(trades_df) < 50:
-        objective_value *= 0.5
 
-    return objective_value
+def _grid_best(sets: list, df_feat_val, signals_val, conf_val):
+    scores = _grid_scores(sets, df_feat_val, signals_val, conf_val)
+    best = int(np.argmax(scores))
+    return float(scores[best]), {name: float(sets[best][name]) for name in EXEC_GRID}
+
+
+def _cv_scores(params: dict, trial: optuna.Trial, score_fn):
+    """
+    Mean score_fn over CV_FOLDS purged folds of the TRAIN window (instead of
+    one validation split). The pruner sees the running mean (the best one
+    for per-set scores) as folds finish.
+    """
+    if _TRAIN_FEATURES is None:
+        _init_worker(_prepare_train_data(_load_train_data()))
+    X, y = build_target(_TRAIN_FEATURES, params["horizon"], sl_mult=params.get("sl_mult", cfg.SL_MULT),
+                        tp_mult=params.get("tp_mult", cfg.TP_MULT), use_cache=True, labels=_TRAIN_LABELS)
+
+    scores = []
+
+    def on_fold(result, done):
+        scores.append(result["score"])
+        trial.report(float(np.max(np.mean(scores, axis=0))), step=PARTIAL_BACKTEST_STEP + done)
+        if trial.should_prune():
+            raise optuna.TrialPruned(f"mean score after {done} of {cfg.CV_FOLDS} folds")
 
+    summary = cross_validate(lambda n_jobs: _make_model(params, n_jobs), X, y, params["horizon"],
+                             df_feat=_TRAIN_FEATURES, score_fn=score_fn, n_splits=cfg.CV_FOLDS,
+                             n_workers=cfg.CV_WORKERS, threads=_XGB_THREADS, on_fold=on_fold)
+    trial.set_user_attr("cv_balanced_accuracy", summary["balanced_accuracy_mean"])
+    # rounds kept by early stopping, median over folds
+    trial.set_user_attr("best_iteration", int(np.median([r["best_iteration"] for r in summary["folds"]])))
+    return summary
 
-def run_optimization(n_trials: int = 50):
-    init_mt5()
-    print(f'Running optimization for {n_trials} trials')
-    study = optuna.create_study(direction="maximize")
-    study.optimize(objective, n_trials=n_trials)
+
+def objective(trial: optuna.Trial) -> float:
+    # Suggest parameters (no indicators here)
+    params = {
+        **_suggest_model_params(trial),
+        # execution / thresholds
+        **_suggest_barriers(trial),
+        **_suggest_thresholds(trial),
+    }
+
+    score_fn = lambda *window: _backtest_score(params, *window)
+    if cfg.CV_FOLDS > 1:
+        summary = _cv_scores(params, trial, score_fn)
+        trial.set_user_attr("cv_score_std", float(summary["score_std"]))
+        return float(summary["score_mean"])
+
+    validation = _validation_signals(params, trial)
+    _prune_on_partial(trial, score_fn, *validation)
+    return score_fn(*validation)
+
+
+def objective_nested(trial: optuna.Trial) -> float:
+    """
+    Outer trial: model params (and the barriers too when they shape the
+    triple-barrier target) are suggested, the model trained once and its
+    validation predictions reused by an inner grid over EXEC_GRID that only
+    re-runs the backtest. The winning execution params are kept in the
+    trial's user attrs.
+    """
+    params = _suggest_model_params(trial)
+    grid = dict(EXEC_GRID)
+    if cfg.TARGET_TYPE == "triple_barrier":
+        params.update(_suggest_barriers(trial))
+        grid["sl_mult"], grid["tp_mult"] = [params["sl_mult"]], [params["tp_mult"]]
+
+    sets = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    if cfg.CV_FOLDS > 1:
+        # one execution set for all folds: the best mean over folds
+        summary = _cv_scores(params, trial, lambda *window: _grid_scores(sets, *window))
+        best = int(np.argmax(summary["score_mean"]))
+        trial.set_user_attr("cv_score_std", float(summary["score_std"][best]))
+        trial.set_user_attr("exec_params", {name: float(sets[best][name]) for name in EXEC_GRID})
+        return float(summary["score_mean"][best])
+
+    validation = _validation_signals(params, trial)
+    _prune_on_partial(trial, lambda *window: _grid_best(sets, *window)[0], *validation)
+    score, exec_params = _grid_best(sets, *validation)
+    trial.set_user_attr("exec_params", exec_params)
+    return score
+
+
+def _best_params(study, mode: str) -> dict:
+    """
+    Parameters of the best trial, with n_estimators set to the rounds its
+    model actually kept after early stopping (the model that was scored),
+    so train_model() refits that model without early stopping.
+    """
+    params = dict(study.best_params)
+    best_iteration = study.best_trial.user_attrs.get("best_iteration")
+    if best_iteration is not None:
+        params["n_estimators"] = best_iteration + 1
+    if mode == "joint":
+        return params
+    # same keys and order as the joint study
+    params = {**params, **study.best_trial.user_attrs["exec_params"]}
+    order = list(EXEC_GRID)
+    return {**{k: v for k, v in params.items() if k not in order}, **{k: params[k] for k in order}}
+
+
+def _storage(path: str = None):
+    path = cfg.OPTIMIZATION_STORAGE if path is None else path
+    if not path:
+        return None
+    if "://" in path:
+        return path
+    # journal file: safe for concurrent writers without a database server
+    from optuna.storages import JournalStorage
+    from optuna.storages.journal import JournalFileBackend, JournalFileOpenLock
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    return JournalStorage(JournalFileBackend(path, lock_obj=JournalFileOpenLock(path)))
+
+
+def study_fingerprint(mode: str, df_raw: pd.DataFrame = None) -> str:
+    """
+    Hash of everything that makes two trials comparable: symbol, timeframe,
+    mode, training window (and the bars actually loaded), target, horizon
+    range, validation / CV setup and the feature set.
+    """
+    settings = {
+        "symbol": cfg.SYMBOL,
+        "timeframe": cfg.TIMEFRAME,
+        "mode": mode,
+        "train": [cfg.TRAIN_START, cfg.TRAIN_END],
+        "target_type": cfg.TARGET_TYPE,
+        "horizon_range": list(cfg.HORIZON_RANGE),
+        "validation_ratio": cfg.VALIDATION_RATIO,
+        "early_stopping_rounds": cfg.EARLY_STOPPING_ROUNDS,
+        "cv": [cfg.CV_FOLDS, cfg.CV_EMBARGO_MULT],
+        "feature_set": FEATURE_SET_VERSION,
+        "features": FEATURE_COLUMNS,
+    }
+    if df_raw is not None and len(df_raw):
+        settings["data"] = [str(df_raw.index[0]), str(df_raw.index[-1]), len(df_raw)]
+    raw = json.dumps(settings, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(raw, digest_size=6).hexdigest()
+
+
+def _study_name(mode: str, fingerprint: str) -> str:
+    return cfg.OPTIMIZATION_STUDY or f"{cfg.SYMBOL}_{cfg.TIMEFRAME}_{mode}_{fingerprint}"
+
+
+def _pruner(name: str = None):
+    name = name or cfg.OPTIMIZATION_PRUNER
+    if name == "median":
+        # no pruning before 5 finished trials or before the second loss checkpoint
+        return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=2 * cfg.PRUNE_CHECKPOINT)
+    if name == "none":
+        return optuna.pruners.NopPruner()
+    raise ValueError(f"Unsupported pruner: {name}")
+
+
+def load_study(mode: str = None, storage: str = None, study_name: str = None,
+               fingerprint: str = None) -> optuna.Study:
+    """
+    Create or reopen the persistent study (trials already stored are kept).
+    The default name carries the settings fingerprint (study_fingerprint()),
+    so a config change starts a new study; a reopened study whose stored
+    fingerprint differs (e.g. a fixed OPTIMIZATION_STUDY name) raises
+    instead of mixing incomparable trials.
+    """
+    mode = mode or cfg.OPTIMIZATION_MODE
+    fingerprint = fingerprint or study_fingerprint(mode)
+    study = optuna.create_study(
+        study_name=study_name or _study_name(mode, fingerprint),
+        storage=_storage(storage),
+        direction="maximize",
+        pruner=_pruner(),
+        load_if_exists=True,
+    )
+    stored = study.user_attrs.get("fingerprint")
+    if stored is None and not study.trials:
+        study.set_user_attr("fingerprint", fingerprint)
+    elif stored != fingerprint:
+        raise ValueError(f'Study "{study.study_name}" was run with other settings or data '
+                         f"(fingerprint {stored}, now {fingerprint}); use another OPTIMIZATION_STUDY name")
+    return study
+
+
+def _pruning_summary(trials: list):
+    """Pruned trials and an estimate of the time they saved against a median finished trial."""
+    TrialState = optuna.trial.TrialState
+    complete = [t for t in trials if t.state == TrialState.COMPLETE]
+    pruned = [t for t in trials if t.state == TrialState.PRUNED]
+    print(f"Trials: {len(complete)} complete, {len(pruned)} pruned, "
+          f"{sum(t.state == TrialState.FAIL for t in trials)} failed")
+
+    if complete and pruned:
+        typical = statistics.median(t.duration.total_seconds() for t in complete)
+        saved = sum(max(typical - t.duration.total_seconds(), 0.0) for t in pruned)
+        print(f"Estimated time saved by pruning: {saved:.0f}s (median complete trial {typical:.1f}s)")
+
+    stopped = [t for t in trials if "best_iteration" in t.user_attrs and "n_estimators" in t.params]
+    if stopped:
+        used = sum(t.user_attrs["best_iteration"] + 1 for t in stopped)
+        asked = sum(t.params["n_estimators"] for t in stopped)
+        print(f"Early stopping: best round at {used / asked:.0%} of requested boosting rounds on average")
+
+
+def _run_worker(mode: str, n_trials: int, storage: str, study_name: str, fingerprint: str) -> dict:
+    study = load_study(mode, storage, study_name, fingerprint)
+    study.optimize(OBJECTIVES[mode], n_trials=n_trials)
+    return _memory_report()
+
+
+def _print_memory_report(shared: dict, workers: list):
+    total = sum(block.nbytes for block in shared.values()) / 2 ** 20
+    sizes = ", ".join(f"{name} {block.nbytes / 2 ** 20:.1f} MB" for name, block in shared.items())
+    print(f"\nShared dataset: {total:.1f} MB in shared memory, one copy ({sizes})")
+    for report in workers:
+        rss = f"{report['rss_mb']:.0f} MB" if report["rss_mb"] is not None else "n/a"
+        views = "zero-copy views" if report["zero_copy"] else "PRIVATE COPY"
+        print(f"  worker {report['pid']}: RSS {rss}, dataset: {views}")
+    copies = sum(not report["zero_copy"] for report in workers)
+    print(f"Private dataset copies across {len(workers)} workers: {copies}")
+
+
+OBJECTIVES = {"joint": objective, "nested": objective_nested}
+
+
+def run_optimization(n_trials: int = 50, mode: str = None, n_workers: int = None, storage: str = None):
+    """
+    Run n_trials more trials of the persistent study (running again resumes
+    or extends it). The training bars are loaded and featurized once here.
+    With n_workers > 1 trials run in a process pool sharing the study
+    storage; features and labels are published in shared memory and every
+    worker attaches zero-copy views (no terminal needed, one copy of the
+    dataset), XGBoost's threads are split between the workers and a memory
+    report is printed at the end.
+    """
+    mode = mode or cfg.OPTIMIZATION_MODE
+    n_workers = n_workers or cfg.OPTIMIZATION_WORKERS
+    if mode not in OBJECTIVES:
+        raise ValueError(f"Unsupported optimization mode: {mode}")
+    storage = cfg.OPTIMIZATION_STORAGE if storage is None else storage
+    if n_workers > 1 and not storage:
+        raise ValueError("Parallel optimization needs a persistent OPTIMIZATION_STORAGE")
+
+    get_bar_source().init()
+    df_raw = _load_train_data()
+    fingerprint = study_fingerprint(mode, df_raw)
+    data = _prepare_train_data(df_raw)
+    study = load_study(mode, storage, fingerprint=fingerprint)
+    already = len(study.trials)
+    print(f'Running {mode} optimization for {n_trials} trials '
+          f'({n_workers} workers, {len(study.trials)} trials already in study "{study.study_name}")')
+
+    if n_workers > 1:
+        xgb_threads = max(1, (os.cpu_count() or 1) // n_workers)
+        shares = [n_trials // n_workers + (k < n_trials % n_workers) for k in range(n_workers)]
+        shared = {name: SharedFrame.publish(df) for name, df in data.items()}
+        try:
+            handles = {name: block.handle for name, block in shared.items()}
+            with ProcessPoolExecutor(n_workers, initializer=_init_worker, initargs=(handles, xgb_threads)) as pool:
+                futures = [pool.submit(_run_worker, mode, share, storage, study.study_name, fingerprint)
+                           for share in shares if share]
+                reports = [future.result() for future in futures]
+            _print_memory_report(shared, reports)
+        finally:
+            for block in shared.values():
+                block.close()
+        study = load_study(mode, storage, study.study_name, fingerprint)
+    else:
+        _init_worker(data)
+        study.optimize(OBJECTIVES[mode], n_trials=n_trials)
+    best_params = _best_params(study, mode)
 
     print("\n=== Optimization finished ===")
+    _pruning_summary(study.trials[already:])
     print(f"Best Sharpe: {study.best_value:.4f}")
     print("Best params:")
-    for k, v in study.best_params.items():
+    for k, v in best_params.items():
         print(f"  {k}: {v}")
 
     # Save best parameters to JSON
     save_path = os.path.join("config", "best_params.json")
     with open(save_path, "w") as f:
-        json.dump(study.best_params, f, indent=4)
+        json.dump(best_params, f, indent=4)
 
     print(f"\nSaved best parameters to {save_path}")
 
     return study
-
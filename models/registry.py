@@ -1,18 +1,124 @@
+import time
+from collections import deque
+
 import numpy as np
 import pandas as pd
-from features.pipeline import build_features
+from features.pipeline import build_features, signal_columns
 from labeling.targets import DECODE_MAP
+from models.signal_cache import SignalCache, model_key, signals_key
+from models.tree_predictor import FlatForest
 from config import settings as cfg
 
+# class index -> signal (-1, 0, 1), vectorized DECODE_MAP
+DECODE = np.array([DECODE_MAP[k] for k in sorted(DECODE_MAP)])
+
 
-def generate_signals(model, df_raw, feature_cols):
-    df_feat = build_features(df_raw)
-    X = df_feat[feature_cols]
+def generate_signals(model, df_raw, feature_cols, use_cache=False):
+    """
+    With use_cache, features come from the feature cache and predictions
+    from the signal cache (keyed by the model and the bar window), so a
+    repeated backtest of the same model and window runs no inference.
+    """
+    # only the model's features (and what the backtest reads) are computed
+    df_feat = build_features(df_raw, use_cache=use_cache, columns=signal_columns(feature_cols))
+    if not use_cache:
+        preds, conf = predict_signals(model, df_feat[feature_cols])
+        return df_feat, preds, conf
 
-    proba = model.predict_proba(X)
-    preds_encoded = model.predict(X)
-    preds = [DECODE_MAP[p] for p in preds_encoded]  # back to -1,0,1
-    conf = proba.max(axis=1)
+    cache = SignalCache()
+    keys = model_key(model), signals_key(df_raw, feature_cols)
+    hit = cache.get(*keys)
+    if hit is not None and np.array_equal(hit[0], df_feat.index.asi8):
+        return df_feat, hit[1].astype(np.int64), hit[2].max(axis=1)
 
+    proba = model.predict_proba(df_feat[feature_cols])
+    preds, conf = decode_proba(proba)
+    cache.put(*keys, df_feat.index, preds, proba)
     return df_feat, preds, conf
 
+
+def decode_proba(proba: np.ndarray):
+    """Signals (-1, 0, 1) and confidence from class probabilities, argmax like model.predict()."""
+    return DECODE[proba.argmax(axis=1)], proba.max(axis=1)
+
+
+def predict_signals(model, X):
+    # one pass: the predicted class is the argmax of the probabilities
+    return decode_proba(model.predict_proba(X))
+
+
+class LiveScorer:
+    """
+    Scores only the newest bar(s) in the live loop.
+
+    Keeps the fitted booster in memory and predicts with inplace_predict
+    from a preallocated float32 buffer (XGBoost compares splits in float32
+    anyway), so no DataFrame or DMatrix is built per bar. Rows are full
+    feature rows laid out as source_columns (e.g. StreamingFeatures.columns);
+    the model's feature_cols are gathered from them by index.
+    With compiled=True the booster is flattened into a FlatForest and
+    walked in NumPy instead (no XGBoost call at all, fastest for a row or
+    two). Every call's latency is kept for latency_summary().
+    """
+
+    def __init__(self, model, feature_cols, source_columns, max_rows: int = 16, history: int = 1000,
+                 compiled: bool = cfg.COMPILED_PREDICTOR):
+        self.booster = model.get_booster()
+        best = getattr(model, "best_iteration", None)
+        # early-stopped models predict with their best round, like predict_proba()
+        self.iteration_range = (0, best + 1) if best is not None else (0, 0)
+        self.forest = FlatForest.from_model(model) if compiled else None
+        position = {name: i for i, name in enumerate(source_columns)}
+        self.index = np.array([position[name] for name in feature_cols])
+        self.buffer = np.empty((max_rows, len(feature_cols)), dtype=np.float32)
+        self.latencies = deque(maxlen=history)
+
+    def score(self, rows: np.ndarray):
+        """Signals and confidence for a (rows, source_columns) array of new bars."""
+        t0 = time.perf_counter()
+        rows = np.atleast_2d(rows)
+        if len(rows) > len(self.buffer):
+            self.buffer = np.empty((len(rows), self.buffer.shape[1]), dtype=np.float32)
+        X = self.buffer[:len(rows)]
+        np.take(rows, self.index, axis=1, out=X)
+        if self.forest is not None:
+            proba = self.forest.predict_proba(X)
+        else:
+            proba = self.booster.inplace_predict(X, iteration_range=self.iteration_range)
+        preds, conf = decode_proba(proba.reshape(len(rows), -1))
+        self.latencies.append(time.perf_counter() - t0)
+        return preds, conf
+
+    def score_row(self, row: np.ndarray):
+        """(signal, confidence) of one bar."""
+        preds, conf = self.score(row)
+        return int(preds[0]), float(conf[0])
+
+    def latency_summary(self) -> dict:
+        """Inference latency over the last calls, in milliseconds."""
+        if not self.latencies:
+            return {}
+        ms = np.array(self.latencies) * 1000
+        return {"n": len(ms), "mean": ms.mean(), "p50": np.percentile(ms, 50),
+                "p99": np.percentile(ms, 99), "max": ms.max()}
+
+
+def benchmark_inference(model, df_feat: pd.DataFrame, feature_cols, window: int = 300, repeat: int = 200) -> dict:
+    """
+    Per-bar latency (ms) of scoring the whole window with the sklearn wrapper
+    (the old live path) against LiveScorer on the last row; asserts both
+    agree on that row.
+    """
+    window_df = df_feat.iloc[-window:]
+    scorer = LiveScorer(model, feature_cols, df_feat.columns)
+    row = window_df.to_numpy()[-1]
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        preds, conf = predict_signals(model, window_df[feature_cols])
+    window_ms = (time.perf_counter() - t0) / repeat * 1000
+
+    for _ in range(repeat):
+        pred, last_conf = scorer.score_row(row)
+    assert pred == preds[-1] and np.isclose(last_conf, conf[-1], rtol=1e-6), "live scorer mismatch"
+    return {"window_ms": window_ms, "live_ms": scorer.latency_summary()["mean"]}
@@ -0,0 +1,67 @@
+# models/signal_cache.py
+
+import hashlib
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from config import settings as cfg
+from features.cache import frame_key
+from features.pipeline import FEATURE_SET_VERSION
+
+
+def model_key(model) -> str:
+    """Content hash of a fitted model (identical for a model and its saved/loaded copies)."""
+    raw = model.get_booster().save_raw(raw_format="ubj")
+    return hashlib.blake2b(bytes(raw), digest_size=16).hexdigest()
+
+
+def signals_key(df_raw: pd.DataFrame, feature_cols, dtype=np.float64) -> str:
+    # the feature set version covers indicator changes that keep their column names
+    return frame_key(df_raw, "signals", FEATURE_SET_VERSION, np.dtype(dtype).name, *feature_cols)
+
+
+class SignalCache:
+    """
+    On-disk predictions under cfg.SIGNAL_CACHE_DIR, one directory per model
+    (model_key()) holding an .npz per bar window (signals_key()): bar times,
+    decoded signals and class probabilities. Entries of a model are dropped
+    together with evict_model() when the model is retired.
+    """
+
+    def __init__(self, root: str = cfg.SIGNAL_CACHE_DIR):
+        self.root = root
+
+    def _path(self, model: str, key: str) -> str:
+        return os.path.join(self.root, model, f"{key}.npz")
+
+    def get(self, model: str, key: str):
+        """(times int64, signals, proba) or None."""
+        path = self._path(model, key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as entry:
+                return entry["time"], entry["signal"], entry["proba"]
+        except Exception:
+            # truncated or unreadable entry
+            os.remove(path)
+            return None
+
+    def put(self, model: str, key: str, index: pd.Index, signals, proba):
+        os.makedirs(os.path.join(self.root, model), exist_ok=True)
+        tmp = self._path(model, key) + ".tmp.npz"
+        np.savez(tmp, time=index.asi8, signal=np.asarray(signals, dtype=np.int8),
+                 proba=np.asarray(proba, dtype=np.float32))
+        os.replace(tmp, self._path(model, key))
+
+    def evict_model(self, model: str) -> int:
+        """Remove every entry of a model, returns the number removed."""
+        path = os.path.join(self.root, model)
+        if not os.path.isdir(path):
+            return 0
+        count = len(os.listdir(path))
+        shutil.rmtree(path)
+        return count
@@ -1,47 +1,46 @@
 import pandas as pd
 from xgboost import XGBClassifier
 from sklearn.metrics import balanced_accuracy_score
-from sklearn.model_selection import train_test_split
 
 from config import settings as cfg
 from features.pipeline import build_features
-from labeling.targets import add_directional_target
+from labeling.targets import build_target
+from models.cv import cross_validate, print_cv_summary, purged_split
+from models.model_store import ModelRegistry
 
-import MetaTrader5 as mt5
-
-from live.mt5_client import get_mt5_rates
-import joblib
-import os
+from live.bar_source import get_bar_source
 
 
 def load_mt5_data():
-    # assumes MT5 already initialized
+    # assumes the bar source is already initialized
     from datetime import datetime
     start = pd.to_datetime(cfg.TEST_START)
     end = pd.to_datetime(cfg.TEST_END)
-    df = get_mt5_rates(cfg.SYMBOL, cfg.TIMEFRAME, start, end)
+    df = get_bar_source().get_rates(cfg.SYMBOL, cfg.TIMEFRAME, start, end)
     return df
 
 
-def train_model(df_raw, model_params=None, horizon=None, baseline=False):
+def train_model(df_raw, model_params=None, horizon=None, baseline=False,
+                sl_mult=cfg.SL_MULT, tp_mult=cfg.TP_MULT,
+                train_start=cfg.TRAIN_START, train_end=cfg.TRAIN_END, save=True, n_jobs=None,
+                cv_folds=cfg.CV_FOLDS):
     if baseline:
         model_params = cfg.BASELINE_PARAMS
         horizon = cfg.BASELINE_HORIZON
+    horizon = horizon or cfg.HORIZON
     # Slice training window
-    df_train = df_raw.loc[cfg.TRAIN_START : cfg.TRAIN_END].copy()
+    df_train = df_raw.loc[train_start : train_end].copy()
 
     # Build features + targets
-    df_feat = build_features(df_train)
-    df_lab = add_directional_target(df_feat, horizon=horizon)
+    df_feat = build_features(df_train, use_cache=True)
 
     # Prepare ML data
-    X = df_lab.drop(columns=["target", "target_raw", "future_ret"])
-    y = df_lab["target"]
+    X, y = build_target(df_feat, horizon, sl_mult=sl_mult, tp_mult=tp_mult)
 
-    # Validation split inside training window
-    X_train, X_val, y_train, y_val = train_test_split(
-        X, y, test_size=cfg.VALIDATION_RATIO, shuffle=False
-    )
+    # Validation split inside training window, purged of labels that look into it
+    train_idx, val_idx = purged_split(len(X), horizon)
+    X_train, X_val = X.iloc[train_idx], X.iloc[val_idx]
+    y_train, y_val = y.iloc[train_idx], y.iloc[val_idx]
 
     params = model_params or {
         "max_depth": 6,
@@ -53,20 +52,29 @@ def train_model(df_raw, model_params=None, horizon=None, baseline=False):
         "num_class": 3,
     }
 
-    model = XGBClassifier(**params)
+    print(f"Training with horizon = {horizon}")
+    if cv_folds > 1:
+        print_cv_summary(cross_validate(lambda jobs: XGBClassifier(**params, n_jobs=jobs), X, y, horizon,
+                                        n_splits=cv_folds))
+
+    model = XGBClassifier(**params, n_jobs=n_jobs)
     model.fit(X_train, y_train)
 
     preds = model.predict(X_val)
-    print(f"Training with horizon = {horizon}")
 
     score = balanced_accuracy_score(y_val, preds)
     print(f"Validation balanced accuracy: {score:.4f}")
-    # Save model
-    os.makedirs("models", exist_ok=True)
-    joblib.dump(model, "models/saved/baseline_model.pkl")
-    # Save feature columns
-    joblib.dump(list(X.columns), "models/saved/feature_cols.pkl")
-    print("Baseline model and feature columns saved.")
+    if not save:
+        return model, X.columns
+
+    # Save model as a new registry version
+    version = ModelRegistry().save(
+        model, X.columns, params, horizon,
+        data_start=df_train.index[0], data_end=df_train.index[-1],
+        metrics={"balanced_accuracy": float(score)},
+        sl_mult=sl_mult, tp_mult=tp_mult, baseline=baseline,
+    )
+    print(f"Model saved as version {version}.")
 
     return model, X.columns
 
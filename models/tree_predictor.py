@@ -0,0 +1,166 @@
+# models/tree_predictor.py
+
+import json
+import time
+
+import numpy as np
+
+ROW_CHUNK = 4096  # rows traversed at once, bounds the (rows, trees) node matrix
+
+
+def _base_score(value: str, num_class: int) -> np.ndarray:
+    # XGBoost >= 3 stores one intercept per class ("[a,b,c]"), older versions a scalar
+    if value.startswith("["):
+        return np.array([float(v) for v in value.strip("[]").split(",")])
+    return np.full(num_class, float(value))
+
+
+class FlatForest:
+    """
+    A multi:softprob XGBoost booster flattened into node arrays.
+
+    All trees' nodes are concatenated (children point to global node
+    indices, leaves point to themselves) and a batch of rows walks every
+    tree at once: one vectorized step per tree level, no DMatrix and no
+    thread dispatch. Splits follow XGBoost: x < threshold goes left,
+    compared in float32, missing values take the default branch. Leaf
+    values are summed per class onto the intercepts and soft-maxed.
+    """
+
+    def __init__(self, feature, threshold, left, right, default_left, value, roots, tree_class, base, depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        self.roots = roots
+        self.tree_class = tree_class
+        self.base = base
+        self.depth = depth
+        self.num_class = len(base)
+
+    @classmethod
+    def from_model(cls, model):
+        """From a fitted (or registry-loaded) XGBClassifier, up to its best round when early-stopped."""
+        best = getattr(model, "best_iteration", None)
+        return cls.from_booster(model.get_booster(), None if best is None else best + 1)
+
+    @classmethod
+    def from_booster(cls, booster, n_rounds: int = None):
+        learner = json.loads(booster.save_raw(raw_format="json"))["learner"]
+        if learner["objective"]["name"] != "multi:softprob":
+            raise ValueError(f"Unsupported objective: {learner['objective']['name']}")
+        if learner["gradient_booster"]["name"] != "gbtree":
+            raise ValueError(f"Unsupported booster: {learner['gradient_booster']['name']}")
+        num_class = int(learner["learner_model_param"]["num_class"])
+        forest = learner["gradient_booster"]["model"]
+        trees, tree_info = forest["trees"], forest["tree_info"]
+        if n_rounds is not None:
+            end = forest["iteration_indptr"][n_rounds]
+            trees, tree_info = trees[:end], tree_info[:end]
+
+        feature, threshold, left, right, default_left, value, roots, depth = [], [], [], [], [], [], [], 0
+        offset = 0
+        for tree in trees:
+            if any(tree["split_type"]):
+                raise ValueError("Categorical splits are not supported")
+            n = len(tree["left_children"])
+            lc = np.array(tree["left_children"])
+            leaf = lc == -1
+            idx = np.arange(n)
+            left.append(np.where(leaf, idx, lc) + offset)
+            right.append(np.where(leaf, idx, np.array(tree["right_children"])) + offset)
+            feature.append(np.where(leaf, 0, tree["split_indices"]))
+            threshold.append(np.array(tree["split_conditions"]))
+            default_left.append(np.array(tree["default_left"], dtype=bool))
+            value.append(np.where(leaf, tree["split_conditions"], 0.0))
+            roots.append(offset)
+            depth = max(depth, _depth(tree["left_children"], tree["right_children"]))
+            offset += n
+
+        return cls(
+            feature=np.concatenate(feature).astype(np.intp),
+            threshold=np.concatenate(threshold).astype(np.float32),
+            left=np.concatenate(left).astype(np.intp),
+            right=np.concatenate(right).astype(np.intp),
+            default_left=np.concatenate(default_left),
+            value=np.concatenate(value).astype(np.float32),
+            roots=np.array(roots, dtype=np.intp),
+            tree_class=np.array(tree_info, dtype=np.intp),
+            base=_base_score(learner["learner_model_param"]["base_score"], num_class),
+            depth=depth,
+        )
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        rows = np.arange(len(X))[:, None]
+        for _ in range(self.depth):
+            x = X[rows, self.feature[node]]
+            go_left = np.where(np.isnan(x), self.default_left[node], x < self.threshold[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def predict_margin(self, X) -> np.ndarray:
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+        margin = np.empty((len(X), self.num_class))
+        for start in range(0, len(X), ROW_CHUNK):
+            leaf_values = self.value[self._leaves(X[start:start + ROW_CHUNK])]
+            for k in range(self.num_class):
+                margin[start:start + ROW_CHUNK, k] = leaf_values[:, self.tree_class == k].sum(axis=1)
+        return margin + self.base
+
+    def predict_proba(self, X) -> np.ndarray:
+        margin = self.predict_margin(X)
+        e = np.exp(margin - margin.max(axis=1, keepdims=True))
+        return e / e.sum(axis=1, keepdims=True)
+
+
+def _depth(left_children, right_children) -> int:
+    depth, level = 0, [0]
+    while True:
+        level = [c for n in level for c in (left_children[n], right_children[n]) if c != -1]
+        if not level:
+            return depth
+        depth += 1
+
+
+def check_parity(model, X, atol: float = 1e-5) -> float:
+    """
+    Compare FlatForest.from_model(model) with model.predict_proba(X).
+    Returns the max absolute difference; raises AssertionError on mismatch.
+    """
+    expected = model.predict_proba(X)
+    actual = FlatForest.from_model(model).predict_proba(np.asarray(X))
+    diff = float(np.abs(actual - expected).max())
+    assert diff <= atol, f"flat forest differs from predict_proba by {diff}"
+    assert (actual.argmax(axis=1) == expected.argmax(axis=1)).all(), "predicted classes differ"
+    return diff
+
+
+def benchmark(model, X, sizes=(1, 100, 100_000), repeat: int = 50) -> list:
+    """
+    Mean ms per call of predict_proba, booster.inplace_predict and
+    FlatForest for batches of each size (rows are repeated when X is shorter).
+    """
+    forest = FlatForest.from_model(model)
+    booster = model.get_booster()
+    best = getattr(model, "best_iteration", None)
+    iteration_range = (0, best + 1) if best is not None else (0, 0)
+    X = np.asarray(X, dtype=np.float32)
+
+    results = []
+    for size in sizes:
+        batch = np.resize(X, (size, X.shape[1]))
+        n = max(1, repeat if size <= 1000 else repeat // 25)
+        timings = {"rows": size}
+        for name, fn in [("predict_proba", model.predict_proba),
+                         ("inplace_predict", lambda b: booster.inplace_predict(b, iteration_range=iteration_range)),
+                         ("flat_forest", forest.predict_proba)]:
+            fn(batch)  # warm-up
+            t0 = time.perf_counter()
+            for _ in range(n):
+                fn(batch)
+            timings[name] = (time.perf_counter() - t0) / n * 1000
+        results.append(timings)
+    return results
@@ -1,7 +1,7 @@
 from config import settings as cfg
 from features.pipeline import build_features
 from labeling.targets import add_directional_target
-from live.mt5_client import init_mt5, get_mt5_rates
+from live.bar_source import get_bar_source
 from models.train import train_model
 from models.registry import generate_signals
 from backtesting.engine import backtest_hedging
@@ -11,9 +11,8 @@ import json
 import os
 
 
-def run_full_pipeline(profile_name="baseline", use_best_params=False):
-    print("=== SignalEngine: Full Pipeline ===")
-
+def load_run_params(profile_name="baseline", use_best_params=False) -> dict:
+    """Execution/target params and model params from best_params.json, or the config defaults."""
     best_params = None
     if use_best_params:
         path = os.path.join("config", "best_params.json")
@@ -25,15 +24,16 @@ def run_full_pipeline(profile_name="baseline", use_best_params=False):
             print("No best_params.json found. Using defaults.")
 
     # Extract optimized parameters or fall back to defaults
-    sl_mult = best_params["sl_mult"] if best_params else cfg.SL_MULT
-    tp_mult = best_params["tp_mult"] if best_params else cfg.TP_MULT
-    conf_threshold = best_params["conf_threshold"] if best_params else cfg.CONF_THRESHOLD
-    atr_norm_threshold = best_params["atr_norm_threshold"] if best_params else cfg.ATR_NORM_THRESHOLD
-    horizon = best_params["horizon"] if best_params else cfg.HORIZON
-
-    model_params = None
+    params = {
+        "sl_mult": best_params["sl_mult"] if best_params else cfg.SL_MULT,
+        "tp_mult": best_params["tp_mult"] if best_params else cfg.TP_MULT,
+        "conf_threshold": best_params["conf_threshold"] if best_params else cfg.CONF_THRESHOLD,
+        "atr_norm_threshold": best_params["atr_norm_threshold"] if best_params else cfg.ATR_NORM_THRESHOLD,
+        "horizon": best_params["horizon"] if best_params else cfg.HORIZON,
+        "model_params": None,
+    }
     if best_params:
-        model_params = {
+        params["model_params"] = {
             "max_depth": best_params["max_depth"],
             "learning_rate": best_params["learning_rate"],
             "n_estimators": best_params["n_estimators"],
@@ -42,33 +42,48 @@ def run_full_pipeline(profile_name="baseline", use_best_params=False):
             "min_child_weight": best_params["min_child_weight"],
             "gamma": best_params["gamma"],
         }
+    return params
+
+
+def run_full_pipeline(profile_name="baseline", use_best_params=False):
+    print("=== SignalEngine: Full Pipeline ===")
+
+    params = load_run_params(profile_name, use_best_params)
+    sl_mult = params["sl_mult"]
+    tp_mult = params["tp_mult"]
+    conf_threshold = params["conf_threshold"]
+    atr_norm_threshold = params["atr_norm_threshold"]
+    horizon = params["horizon"]
+    model_params = params["model_params"]
 
-    # 1. Init MT5
-    print("Initializing MT5...")
-    init_mt5()
+    # 1. Init bar source (MT5 terminal or offline replay)
+    print(f"Initializing bar source '{cfg.BAR_SOURCE}'...")
+    source = get_bar_source()
+    source.init()
 
     # 2. Load TRAINING data
-    print("Loading MT5 training data...")
+    print("Loading training data...")
     train_start = pd.to_datetime(cfg.TRAIN_START)
     train_end   = pd.to_datetime(cfg.TRAIN_END)
-    df_train = get_mt5_rates(cfg.SYMBOL, cfg.TIMEFRAME, train_start, train_end)
+    df_train = source.get_rates(cfg.SYMBOL, cfg.TIMEFRAME, train_start, train_end)
     print(f"Loaded {len(df_train)} training bars")
 
     # 3. Train model
     print("Training model...")
     # model, feature_cols = train_model(df_train)
-    model, feature_cols = train_model(df_train, model_params=model_params, horizon=horizon)
+    model, feature_cols = train_model(df_train, model_params=model_params, horizon=horizon,
+                                      sl_mult=sl_mult, tp_mult=tp_mult)
 
     # 4. Load TEST data
-    print("Loading MT5 test data...")
+    print("Loading test data...")
     test_start = pd.to_datetime(cfg.TEST_START)
     test_end   = pd.to_datetime(cfg.TEST_END)
-    df_test = get_mt5_rates(cfg.SYMBOL, cfg.TIMEFRAME, test_start, test_end)
+    df_test = source.get_rates(cfg.SYMBOL, cfg.TIMEFRAME, test_start, test_end)
     print(f"Loaded {len(df_test)} test bars")
 
     # 5. Generate signals on TEST data
     print("Generating signals...")
-    df_feat, signals, conf = generate_signals(model, df_test, feature_cols)
+    df_feat, signals, conf = generate_signals(model, df_test, feature_cols, use_cache=True)
 
     # 6. Backtest
     print("Running backtest...")
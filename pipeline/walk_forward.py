@@ -0,0 +1,184 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from config import settings as cfg
+from features.pipeline import signal_columns
+from features.registry import required_lookback
+from live.bar_source import get_bar_source
+from models.train import train_model
+from models.registry import generate_signals
+from backtesting.engine import backtest_hedging
+from backtesting.metrics import sharpe_ratio
+from pipeline.run_full import load_run_params
+from utils.shared_frame import SharedFrame
+
+# set once per process (see _init_worker): the raw bars every fold slices from
+_BARS = None
+_XGB_THREADS = None
+_SHARED = []
+
+
+def _init_worker(bars, xgb_threads: int = None):
+    """bars is the frame itself (same process) or a SharedFrame handle (worker processes)."""
+    global _BARS, _XGB_THREADS
+    if isinstance(bars, dict):
+        shared = SharedFrame.attach(bars)
+        _SHARED.append(shared)
+        bars = shared.frame()
+    _BARS = bars
+    _XGB_THREADS = xgb_threads
+
+
+def make_folds(start=cfg.WALK_FORWARD_START, end=cfg.WALK_FORWARD_END,
+               train_days: int = cfg.WALK_FORWARD_TRAIN_DAYS, test_days: int = cfg.WALK_FORWARD_TEST_DAYS,
+               step_days: int = None, tz: str = cfg.LOCAL_TZ) -> list:
+    """
+    Rolling train/test windows over [start, end): every fold trains on
+    train_days and tests on the following test_days, the next fold starts
+    step_days later. Windows are half-open, the last test window is cut at end.
+    Offsets are calendar days (DateOffset), so boundaries stay at local
+    midnight across DST changes instead of drifting by an hour.
+    """
+    step = pd.DateOffset(days=step_days or cfg.WALK_FORWARD_STEP_DAYS or test_days)
+    start = pd.Timestamp(start).tz_localize(tz)
+    end = pd.Timestamp(end).tz_localize(tz)
+
+    folds = []
+    train_start = start
+    while True:
+        test_start = train_start + pd.DateOffset(days=train_days)
+        if test_start >= end:
+            break
+        folds.append({
+            "fold": len(folds),
+            "train_start": train_start,
+            "test_start": test_start,
+            "test_end": min(test_start + pd.DateOffset(days=test_days), end),
+        })
+        train_start += step
+    return folds
+
+
+def _run_fold(fold: dict, params: dict) -> dict:
+    """Train on the fold's window, backtest its test window with a fresh balance."""
+    train_end = fold["test_start"] - pd.Timedelta(seconds=1)
+    model, feature_cols = train_model(
+        _BARS, model_params=params["model_params"], horizon=params["horizon"],
+        sl_mult=params["sl_mult"], tp_mult=params["tp_mult"],
+        train_start=fold["train_start"], train_end=train_end, save=False, n_jobs=_XGB_THREADS,
+    )
+
+    # warm the indicators up on the bars just before the test window
+    first = _BARS.index.searchsorted(fold["test_start"])
+    last = _BARS.index.searchsorted(fold["test_end"])
+    df_test = _BARS.iloc[max(0, first - required_lookback(signal_columns(feature_cols))):last]
+    df_feat, signals, conf = generate_signals(model, df_test, feature_cols)
+    mask = df_feat.index >= fold["test_start"]
+    df_feat = df_feat[mask]
+    signals = np.asarray(signals)[mask]
+    conf = np.asarray(conf)[mask]
+
+    final_balance, equity_df, trades_df = backtest_hedging(
+        df_feat, signals, conf,
+        sl_mult=params["sl_mult"],
+        tp_mult=params["tp_mult"],
+        initial_balance=cfg.INITIAL_BALANCE,
+        position_size=cfg.POSITION_SIZE,
+        conf_threshold=params["conf_threshold"],
+        atr_norm_threshold=params["atr_norm_threshold"],
+        contr_size=1,
+        lev=cfg.LEVARAGE,
+        marg_limit=cfg.MARGIN_LIMIT
+    )
+
+    n_trades = len(trades_df)
+    return {
+        "fold": fold["fold"],
+        "train_start": fold["train_start"],
+        "test_start": fold["test_start"],
+        "test_end": fold["test_end"],
+        "test_bars": len(df_feat),
+        "final_balance": final_balance,
+        "pnl": final_balance - cfg.INITIAL_BALANCE,
+        "return_pct": (final_balance / cfg.INITIAL_BALANCE - 1) * 100,
+        "sharpe": sharpe_ratio(equity_df["equity"]),
+        "n_trades": n_trades,
+        "win_rate": (trades_df["pnl"] > 0).mean() if n_trades else 0.0,
+        "equity": equity_df["equity"],
+    }
+
+
+def stitch_equity(results: list, initial_balance: float = cfg.INITIAL_BALANCE) -> pd.Series:
+    """
+    One out-of-sample equity curve: every fold starts from a fresh balance
+    (fixed position size), so its PnL is carried on from where the previous
+    fold's curve ended.
+    """
+    parts = []
+    offset = 0.0
+    for result in sorted(results, key=lambda r: r["fold"]):
+        equity = result["equity"].astype(np.float64)
+        if parts:
+            equity = equity[equity.index > parts[-1].index[-1]]  # overlapping test windows
+        if len(equity) == 0:
+            continue
+        parts.append(equity + offset)
+        offset = parts[-1].iloc[-1] - initial_balance
+    if not parts:
+        return pd.Series([float(initial_balance)], name="equity")
+    return pd.concat(parts).rename("equity")
+
+
+def _print_summary(folds_df: pd.DataFrame, equity: pd.Series):
+    print("\n=== Walk-Forward Summary ===")
+    print(folds_df.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    pnl = equity.iloc[-1] - cfg.INITIAL_BALANCE
+    print(f"\nFolds:             {len(folds_df)}")
+    print(f"Profitable folds:  {(folds_df['pnl'] > 0).sum()} / {len(folds_df)}")
+    print(f"Total PnL:         {pnl:.2f} ({pnl / cfg.INITIAL_BALANCE * 100:.2f}% of initial balance)")
+    print(f"Mean fold Sharpe:  {folds_df['sharpe'].mean():.2f}")
+    print(f"Stitched Sharpe:   {sharpe_ratio(equity):.2f}")
+    print(f"Total trades:      {folds_df['n_trades'].sum()}")
+
+
+def run_walk_forward(profile_name="baseline", use_best_params=False, n_workers: int = None, folds: list = None):
+    """
+    Retrain and backtest every fold of make_folds() (or the given folds).
+    The bars are loaded once here; with n_workers > 1 folds run in a process
+    pool on a zero-copy shared-memory copy of them, XGBoost's threads split
+    between the workers. Returns (per-fold metrics, stitched equity curve).
+    """
+    print("=== SignalEngine: Walk-Forward ===")
+    n_workers = n_workers or cfg.WALK_FORWARD_WORKERS
+    params = load_run_params(profile_name, use_best_params)
+    folds = make_folds() if folds is None else folds
+    if not folds:
+        raise ValueError("Walk-forward range is shorter than one training window")
+
+    source = get_bar_source()
+    source.init()
+    # indicator warm-up before the first test window is covered by the training window
+    bars = source.get_rates(cfg.SYMBOL, cfg.TIMEFRAME, folds[0]["train_start"], folds[-1]["test_end"])
+    print(f"Loaded {len(bars)} bars, {len(folds)} folds "
+          f"({folds[0]['train_start']:%Y-%m-%d} .. {folds[-1]['test_end']:%Y-%m-%d}), {n_workers} workers")
+
+    if n_workers > 1:
+        xgb_threads = max(1, (os.cpu_count() or 1) // n_workers)
+        shared = SharedFrame.publish(bars)
+        try:
+            with ProcessPoolExecutor(n_workers, initializer=_init_worker,
+                                     initargs=(shared.handle, xgb_threads)) as pool:
+                results = list(pool.map(_run_fold, folds, [params] * len(folds)))
+        finally:
+            shared.close()
+    else:
+        _init_worker(bars)
+        results = [_run_fold(fold, params) for fold in folds]
+
+    equity = stitch_equity(results)
+    folds_df = pd.DataFrame([{k: v for k, v in r.items() if k != "equity"} for r in results])
+    _print_summary(folds_df, equity)
+    return folds_df, equity
@@ -4,31 +4,34 @@ import webbrowser
 
 import pandas as pd
 
-from dashboard.generate_dashboard import basic_summary, generate_db_file, generate_dashboard
-from dashboard.html_report import generate_html_report
-from dashboard.metrics import add_confidence_bucket, profit_by_confidence, profit_by_conf_and_direction
-
 from live.live_trader import live_trading_loop
-from live.mt5_client import init_mt5, get_mt5_rates
+from live.bar_source import get_bar_source
 from models.optimize import run_optimization
+from models.model_store import ModelRegistry, print_versions
+from models.live_loader import load_live_model
+from models.tree_predictor import benchmark, check_parity
+from features.pipeline import build_features, signal_columns
 from models.train import train_model
 from backtesting.reports import run_backtest, plot_equity
 from pipeline.run_full import run_full_pipeline
+from pipeline.walk_forward import run_walk_forward
+from utils.event_store import EventStore
 from config import settings as cfg
 
 
 
 def run_train(baseline):
-    init_mt5()
+    source = get_bar_source()
+    source.init()
     train_start = pd.to_datetime(cfg.TRAIN_START)
     train_end = pd.to_datetime(cfg.TRAIN_END)
-    df_train = get_mt5_rates(cfg.SYMBOL, cfg.TIMEFRAME, train_start, train_end)
+    df_train = source.get_rates(cfg.SYMBOL, cfg.TIMEFRAME, train_start, train_end)
     train_model(df_train, baseline=baseline)
     print("Training finished.")
 
 
 def run_backtest_cli():
-    init_mt5()
+    get_bar_source().init()
     model, feature_cols = train_model()  # later: load from disk instead
     equity_df, trades_df = run_backtest(model, feature_cols)
     plot_equity(equity_df)
@@ -39,6 +42,33 @@ def run_live():
     print("Live trading placeholder")
 
 
+def run_models_cli():
+    registry = ModelRegistry()
+    print_versions(registry)
+    version = input("Version to pin (empty = keep, '-' = unpin, 'retire <version>'): ").strip()
+    if version == "-":
+        registry.unpin()
+    elif version.startswith("retire "):
+        evicted = registry.retire(version.split()[1])
+        print(f"Retired, {evicted} cached prediction sets removed.")
+    elif version:
+        registry.pin(version)
+    print(f"Live model: {registry.live_version()}")
+
+
+def run_benchmark_cli():
+    """FlatForest parity and per-call latency against XGBoost for the live model on the test window."""
+    source = get_bar_source()
+    source.init()
+    model, feature_cols = load_live_model()
+    df_raw = source.get_rates(cfg.SYMBOL, cfg.TIMEFRAME, pd.to_datetime(cfg.TEST_START), pd.to_datetime(cfg.TEST_END))
+    X = build_features(df_raw, columns=signal_columns(feature_cols))[feature_cols]
+    print(f"Max probability difference on {len(X)} rows: {check_parity(model, X):.2e}")
+    print(f"{'rows':>8}{'predict_proba':>16}{'inplace_predict':>18}{'flat_forest':>14}  (ms per call)")
+    for r in benchmark(model, X):
+        print(f"{r['rows']:>8}{r['predict_proba']:>16.3f}{r['inplace_predict']:>18.3f}{r['flat_forest']:>14.3f}")
+
+
 def main():
     print("=== SignalEngine ===")
     print("1. Full pipeline (baseline)")
@@ -49,6 +79,11 @@ def main():
     print("5. Optimize")
     print("6. Generate Dashboard DB")
     print("7. Dashboard Report")
+    print("8. Walk-forward (baseline)")
+    print("81. Walk-forward (optimized)")
+    print("9. Models (list / pin)")
+    print("10. Import CSV logs into the event store")
+    print("12. Benchmark live model inference")
 
     choice = input("Select option: ")
 
@@ -66,10 +101,23 @@ def main():
         print("Running optimization...")
         run_optimization(n_trials=cfg.OPTIMIZATION_TRIALS)
     elif choice == "6":
+        # the dashboard reads the deal history from the MT5 terminal, imported only when used
+        from dashboard.generate_dashboard import generate_db_file
         generate_db_file()
     elif choice == "7":
+        from dashboard.generate_dashboard import generate_dashboard
         report_path = generate_dashboard()
         webbrowser.open(report_path)
+    elif choice == "8":
+        run_walk_forward(profile_name="baseline", use_best_params=False)
+    elif choice == "81":
+        run_walk_forward(profile_name="optimized", use_best_params=True)
+    elif choice == "9":
+        run_models_cli()
+    elif choice == "10":
+        print(f"{EventStore().import_logs()} events imported into {cfg.EVENT_STORE_PATH}")
+    elif choice == "12":
+        run_benchmark_cli()
 
 
     else:
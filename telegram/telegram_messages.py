@@ -1,28 +1,30 @@
-import pandas as pd
 from datetime import datetime
 import requests
 
+from utils.event_store import EventStore
+
 
 TOKEN =''
 CHAT_ID = 123
 
 
-def generate_hourly_summary():
-    df = pd.read_csv("logs/live_trading.csv")
+def generate_hourly_summary(store: EventStore = None):
+    store = store or EventStore()
 
     last_hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
-    df_hour = df[df["timestamp"] >= last_hour.strftime("%Y-%m-%d %H:%M:%S")]
+    # counted over the (ts, event) index, the rest of the history is not read
+    counts = store.count_by_event(start=last_hour)
 
-    trades_opened = df_hour[df_hour["event"] == "OPEN_TRADE"]
-    blocked = df_hour[df_hour["event"] == "TRADE_BLOCKED_MARGIN"]
-    no_trades = df_hour[df_hour["event"].str.startswith("NO_TRADE")]
+    trades_opened = counts.get("OPEN_TRADE", 0)
+    blocked = counts.get("TRADE_BLOCKED_MARGIN", 0)
+    no_trades = sum(n for event, n in counts.items() if event.startswith("NO_TRADE"))
 
     summary = (
         f"📊 *Hourly Trading Summary*\n"
         f"Time: {last_hour}\n\n"
-        f"Opened trades: {len(trades_opened)}\n"
-        f"Blocked (margin): {len(blocked)}\n"
-        f"No-trade signals: {len(no_trades)}\n"
+        f"Opened trades: {trades_opened}\n"
+        f"Blocked (margin): {blocked}\n"
+        f"No-trade signals: {no_trades}\n"
     )
 
     return summary
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# tests import the project packages (config, features, models, ...) from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="module")
+def bars():
+    # random-walk M5 bars over a DST change, with a gap like a weekend
+    rng = np.random.default_rng(7)
+    n = 3000
+    index = pd.date_range("2025-03-27", periods=n, freq="5min", tz="Europe/Sofia")
+    index = index.delete(slice(1000, 1300))
+    close = 1.10 * np.exp(np.cumsum(rng.normal(0, 4e-4, len(index))))
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0, 3e-4, len(index)))
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+    }, index=index)
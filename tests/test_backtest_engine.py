@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting.engine import backtest_hedging, backtest_hedging_loop
+from backtesting.grid import backtest_grid
+from features.pipeline import build_features
+
+PARAM_SETS = [
+    {},
+    {"sl_mult": 0.8, "tp_mult": 3.0, "conf_threshold": 0.4},
+    {"sl_mult": 2.5, "tp_mult": 1.0, "atr_norm_threshold": 0.0008},
+    # margin limit low enough that overlapping trades get blocked
+    {"sl_mult": 3.0, "tp_mult": 4.0, "conf_threshold": 0.0, "atr_norm_threshold": 0.0, "marg_limit": 0.002,
+     "position_size": 2.0, "lev": 10},
+]
+
+
+@pytest.fixture(scope="module")
+def signal_data(bars):
+    df = build_features(bars)
+    rng = np.random.default_rng(11)
+    signals = rng.choice([-1, 0, 1], size=len(df), p=[0.3, 0.4, 0.3])
+    conf = rng.uniform(0.3, 0.9, size=len(df))
+    return df, signals, conf
+
+
+@pytest.mark.parametrize("params", PARAM_SETS)
+def test_vectorized_backtest_matches_loop(signal_data, params):
+    df, signals, conf = signal_data
+    expected = backtest_hedging_loop(df, signals, conf, **params)
+    actual = backtest_hedging(df, signals, conf, **params)
+
+    assert len(expected[2]) > 0
+    assert actual[0] == expected[0]
+    pd.testing.assert_frame_equal(actual[1], expected[1])
+    pd.testing.assert_frame_equal(actual[2], expected[2])
+
+
+def test_grid_matches_single_backtests(signal_data):
+    df, signals, conf = signal_data
+    sets = [p for p in PARAM_SETS if "position_size" not in p and "lev" not in p]
+    results = backtest_grid(df, signals, conf, sets)
+    for params, row in zip(sets, results.itertuples()):
+        final_balance, _, trades_df = backtest_hedging(df, signals, conf, **params)
+        assert row.final_balance == final_balance
+        assert row.n_trades == len(trades_df)
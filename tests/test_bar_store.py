@@ -0,0 +1,68 @@
+import numpy as np
+
+from live.bar_store import BAR_DTYPE, BarStore, to_epoch
+
+START = 1_735_000_000 // 300 * 300  # Dec 2024, long before FINAL_LAG_SECONDS
+STEP = 300
+
+
+def rates(first: int, n: int, price: float = 1.0) -> np.ndarray:
+    out = np.zeros(n, dtype=BAR_DTYPE)
+    out["time"] = START + (first + np.arange(n)) * STEP
+    for name in ("open", "high", "low", "close"):
+        out[name] = price + np.arange(n)
+    return out
+
+
+def test_partial_download_is_covered_up_to_its_last_bar(tmp_path):
+    store = BarStore("X", "M5", root=str(tmp_path))
+    requested = []
+
+    def downloader(date_from, date_to):
+        requested.append((to_epoch(date_from), to_epoch(date_to)))
+        # the terminal only has the first 50 bars of the range so far
+        return rates(0, 50) if len(requested) == 1 else rates(50, 50)
+
+    end = START + 99 * STEP
+    assert len(store.fetch(START, end, downloader)) == 50
+    assert store.coverage() == [[START, START + 49 * STEP]]
+
+    # the rest of the range is requested again, not assumed empty
+    assert len(store.fetch(START, end, downloader)) == 100
+    assert requested[1] == (START + 49 * STEP + 1, end)
+    assert store.coverage() == [[START, end]]
+
+
+def test_empty_download_covers_nothing(tmp_path):
+    store = BarStore("X", "M5", root=str(tmp_path))
+    store.append(rates(0, 0), START, START + 10 * STEP)
+    assert store.coverage() == []
+
+
+def test_newer_bars_are_written_in_place(tmp_path):
+    store = BarStore("X", "M5", root=str(tmp_path))
+    store.append(rates(0, 100), START, START + 99 * STEP)
+    size = (tmp_path / "X_M5" / "bars.npy").stat().st_size
+
+    # replaces the last stored bar (it was still forming) and extends the file
+    tail = rates(99, 11, price=5.0)
+    assert store._write_tail(tail)
+    bars = np.load(store.bars_path)
+    assert len(bars) == 110
+    assert (tmp_path / "X_M5" / "bars.npy").stat().st_size == size + 10 * BAR_DTYPE.itemsize
+    np.testing.assert_array_equal(bars[:99], rates(0, 99))
+    np.testing.assert_array_equal(bars[99:], tail)
+
+
+def test_older_or_interleaved_bars_rewrite_the_file(tmp_path):
+    store = BarStore("X", "M5", root=str(tmp_path))
+    store.append(rates(50, 50), START + 50 * STEP, START + 99 * STEP)
+    assert not store._write_tail(rates(0, 60, price=7.0))
+
+    store.append(rates(0, 60, price=7.0), START, START + 59 * STEP)
+    bars = store.slice(START, START + 99 * STEP)
+    assert len(bars) == 100 and (np.diff(bars["time"]) == STEP).all()
+    # the fresher download wins for the overlapping bars
+    np.testing.assert_array_equal(bars[:60], rates(0, 60, price=7.0))
+    np.testing.assert_array_equal(bars[60:], rates(50, 50)[10:])
+    assert store.coverage() == [[START, START + 99 * STEP]]
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from models.cv import cross_validate
+
+
+class RecordingModel:
+    """Classifier stub that records every row index it is fitted or early-stopped on."""
+
+    early_stopping_rounds = 10
+
+    def __init__(self, seen):
+        self.seen = seen
+
+    def fit(self, X, y, eval_set=None, verbose=None):
+        self.seen.append(set(X.index))
+        for X_eval, _ in eval_set or []:
+            self.seen.append(set(X_eval.index))
+        return self
+
+    def predict_proba(self, X):
+        return np.tile([0.2, 0.6, 0.2], (len(X), 1))
+
+    def predict(self, X):
+        return np.ones(len(X), dtype=int)
+
+
+def test_test_block_never_reaches_fit():
+    n, horizon = 600, 12
+    X = pd.DataFrame({"f": np.arange(n, dtype=float)})
+    y = pd.Series(np.arange(n) % 3)
+    fits = []
+
+    def make_model(n_jobs):
+        seen = []
+        fits.append(seen)
+        return RecordingModel(seen)
+
+    summary = cross_validate(make_model, X, y, horizon, n_splits=4, n_workers=1)
+
+    bounds = np.linspace(0, n, 5).astype(int)
+    for fold, seen in zip(summary["folds"], fits):
+        test = set(range(bounds[fold["fold"]], bounds[fold["fold"] + 1]))
+        fit_rows, stop_rows = seen
+        assert not (fit_rows | stop_rows) & test
+        # the early-stopping slice is the tail of the training rows, purged from the fit rows
+        assert min(stop_rows) - max(fit_rows) > horizon
@@ -0,0 +1,40 @@
+import os
+
+import pandas as pd
+
+from features.cache import FeatureCache
+
+
+def test_evict_skips_entries_removed_by_another_process(tmp_path, monkeypatch):
+    cache = FeatureCache(root=str(tmp_path), max_mb=0)
+    for key in ("a", "b", "c"):
+        pd.DataFrame({"x": range(100)}).to_pickle(tmp_path / f"{key}.pkl")
+
+    real_remove = os.remove
+
+    def racing_remove(path):
+        # another worker evicts the same entry first
+        real_remove(path)
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(os, "remove", racing_remove)
+    cache.evict()
+    assert not list(tmp_path.glob("*.pkl"))
+
+
+def test_evict_skips_entries_gone_before_stat(tmp_path, monkeypatch):
+    cache = FeatureCache(root=str(tmp_path), max_mb=0)
+    for key in ("a", "b"):
+        pd.DataFrame({"x": range(100)}).to_pickle(tmp_path / f"{key}.pkl")
+
+    real_stat = os.stat
+
+    def racing_stat(path, *args, **kwargs):
+        if str(path).endswith("a.pkl"):
+            os.unlink(path)
+            raise FileNotFoundError(path)
+        return real_stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "stat", racing_stat)
+    cache.evict()
+    assert not list(tmp_path.glob("*.pkl"))
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from features.pipeline import FEATURE_COLUMNS, build_features, build_features_ta, check_parity
+
+
+def test_kernels_match_ta(bars):
+    feat = build_features(bars)
+    assert set(FEATURE_COLUMNS) <= set(feat.columns)
+    assert len(feat) > len(bars) // 2
+    assert check_parity(bars) < 1e-6
+
+
+def test_every_feature_matches_ta(bars):
+    fast = build_features(bars)
+    ref = build_features_ta(bars)
+    for name in FEATURE_COLUMNS:
+        np.testing.assert_allclose(fast[name], ref[name], rtol=1e-9, atol=1e-6, err_msg=name)
+
+
+def test_float32_matches_float64(bars):
+    fast = build_features(bars, dtype=np.float32)
+    ref = build_features(bars)
+    assert (fast[FEATURE_COLUMNS].dtypes == np.float32).all()
+    assert fast.index.equals(ref.index)
+    for name in FEATURE_COLUMNS:
+        scale = max(1.0, float(np.abs(ref[name]).max()))
+        np.testing.assert_allclose(fast[name], ref[name], rtol=1e-4, atol=1e-5 * scale, err_msg=name)
+
+
+def test_columns_subset_matches_full_build(bars):
+    columns = ["ret_1", "hour_cos", "rsi", "atr_norm", "bb_width"]
+    subset = build_features(bars, columns=columns)
+    full = build_features(bars)
+    assert list(subset.columns) == ["open", "high", "low", "close"] + columns
+    # only the requested features decide the warm-up, so the subset keeps at least as many rows
+    assert full.index.isin(subset.index).all()
+    pd.testing.assert_frame_equal(subset.loc[full.index], full[subset.columns], check_freq=False)
+
+
+def test_unknown_column_raises(bars):
+    with pytest.raises(KeyError):
+        build_features(bars, columns=["ret_1", "no_such_feature"])
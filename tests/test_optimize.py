@@ -0,0 +1,30 @@
+import pandas as pd
+import pytest
+
+from config import settings as cfg
+from models.optimize import load_study, study_fingerprint
+
+
+def test_config_change_starts_a_new_study(tmp_path, monkeypatch):
+    storage = str(tmp_path / "journal.log")
+    study = load_study("joint", storage)
+    study.enqueue_trial({})  # any stored trial
+    monkeypatch.setattr(cfg, "HORIZON_RANGE", (6, 48))
+    other = load_study("joint", storage)
+    assert other.study_name != study.study_name
+    assert not other.trials
+
+
+def test_reopened_study_with_other_settings_raises(tmp_path, monkeypatch):
+    storage = str(tmp_path / "journal.log")
+    monkeypatch.setattr(cfg, "OPTIMIZATION_STUDY", "fixed")
+    load_study("joint", storage)
+    monkeypatch.setattr(cfg, "CV_FOLDS", cfg.CV_FOLDS + 3)
+    with pytest.raises(ValueError):
+        load_study("joint", storage)
+
+
+def test_fingerprint_covers_the_loaded_bars():
+    index = pd.date_range("2025-06-01", periods=10, freq="5min", tz="UTC")
+    bars = pd.DataFrame({"close": range(10)}, index=index)
+    assert study_fingerprint("joint", bars) != study_fingerprint("joint", bars.iloc[1:])
@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from execution import terminal
+from execution.terminal import PaperTerminal, use_paper
+
+
+class Bars:
+    """Bar source stub serving one bar at a time."""
+
+    def __init__(self, rows):
+        index = pd.date_range("2025-06-02 10:00", periods=len(rows), freq="5min", tz="Europe/Sofia")
+        self.df = pd.DataFrame(rows, columns=["open", "high", "low", "close"], index=index)
+        self.cursor = 0
+
+    def get_bars(self, symbol, timeframe, n=500):
+        return self.df.iloc[max(0, self.cursor - n + 1):self.cursor + 1]
+
+
+@pytest.fixture
+def paper(monkeypatch):
+    monkeypatch.setattr(terminal, "_paper", None)
+    bars = Bars([(100, 101, 99, 100), (100, 100.5, 97, 98), (98, 104, 98, 103)])
+    return bars, use_paper(bars, "X", "M5")
+
+
+def order(t, direction, sl, tp):
+    return {"action": t.TRADE_ACTION_DEAL, "symbol": "X", "volume": 1.0,
+            "type": t.ORDER_TYPE_BUY if direction == 1 else t.ORDER_TYPE_SELL,
+            "price": t.symbol_info_tick("X").ask, "sl": sl, "tp": tp}
+
+
+def test_broker_calls_go_to_the_paper_terminal(paper):
+    from execution.margin import compute_required_margin, margin_allowed
+
+    bars, t = paper
+    assert terminal.terminal() is t
+    assert compute_required_margin("X", 1, 2.0) == pytest.approx(2.0 * 100 / t.leverage)
+    assert margin_allowed(10.0, 1, 0.5)
+
+
+def test_stop_loss_settles_on_a_later_bar(paper):
+    bars, t = paper
+    assert t.order_send(order(t, 1, sl=98.5, tp=105)).retcode == t.TRADE_RETCODE_DONE
+    # the entry bar's own range does not settle the position
+    assert len(t.positions_get()) == 1
+
+    bars.cursor = 1
+    assert t.positions_get() == ()
+    assert t.balance == pytest.approx(PaperTerminal(bars).balance - 1.5)
+
+
+def test_open_position_marks_to_the_newest_close(paper):
+    bars, t = paper
+    t.order_send(order(t, -1, sl=110, tp=90))
+    bars.cursor = 2
+    (p,) = t.positions_get("X")
+    assert p.profit == pytest.approx(-3.0)
+    account = t.account_info()
+    assert account.equity == pytest.approx(t.balance - 3.0)
+
+    result = t.order_send({"action": t.TRADE_ACTION_DEAL, "symbol": "X", "volume": 1.0, "type": t.ORDER_TYPE_BUY,
+                           "position": p.ticket, "price": 103.0})
+    assert result.retcode == t.TRADE_RETCODE_DONE and not t.positions
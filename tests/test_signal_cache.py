@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+import models.signal_cache as signal_cache
+from models.signal_cache import SignalCache, signals_key
+
+
+def _bars(n=50):
+    index = pd.date_range("2025-06-02", periods=n, freq="5min", tz="Europe/Sofia", name="time")
+    close = 2000 + np.cumsum(np.random.default_rng(0).normal(size=n))
+    return pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close}, index=index)
+
+
+def test_feature_set_version_bump_misses_the_cache(tmp_path, monkeypatch):
+    bars = _bars()
+    cols = ["ret_1", "atr"]
+    cache = SignalCache(root=str(tmp_path))
+    key = signals_key(bars, cols)
+    cache.put("model", key, bars.index, np.zeros(len(bars)), np.full((len(bars), 3), 1 / 3))
+    assert cache.get("model", signals_key(bars, cols)) is not None
+
+    monkeypatch.setattr(signal_cache, "FEATURE_SET_VERSION", signal_cache.FEATURE_SET_VERSION + 1)
+    assert signals_key(bars, cols) != key
+    assert cache.get("model", signals_key(bars, cols)) is None
+
+
+def test_feature_dtype_is_part_of_the_key():
+    bars = _bars()
+    assert signals_key(bars, ["ret_1"]) != signals_key(bars, ["ret_1"], dtype=np.float32)
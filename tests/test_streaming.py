@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from features.pipeline import build_features_ta
+from features.streaming import OHLC_COLUMNS, StreamingFeatures, check_parity
+
+
+def _stream(engine, bars, forming=False):
+    """Feed bars one at a time; with forming, each bar first arrives as a partial bar that is then replaced."""
+    rows = {}
+    for ts, (o, h, l, c) in zip(bars.index, bars[OHLC_COLUMNS].to_numpy(dtype=float)):
+        if forming:
+            # the forming bar: same open, part of the range and another close, updated twice
+            mid = (h + l) / 2
+            engine.update(ts, o, max(o, mid), min(o, mid), mid)
+            engine.update(ts, o, h, min(o, mid), h)
+        row = engine.update(ts, o, h, l, c)
+        if engine.ready:
+            rows[ts] = row.copy()
+    return pd.DataFrame.from_dict(rows, orient="index", columns=StreamingFeatures.columns)
+
+
+def test_streaming_matches_ta(bars):
+    assert check_parity(bars) < 1e-6
+
+
+def test_replaced_forming_bars_match_closed_bars(bars):
+    stream = _stream(StreamingFeatures(), bars, forming=True)
+    expected = build_features_ta(bars)[StreamingFeatures.columns]
+    assert stream.index.equals(expected.index)
+    np.testing.assert_allclose(stream.to_numpy(), expected.to_numpy(dtype=float), rtol=1e-9, atol=1e-6)
+
+
+def test_seeded_engine_continues_like_a_full_stream(bars):
+    split = len(bars) // 2
+    engine = StreamingFeatures.from_history(bars.iloc[:split])
+    stream = _stream(engine, bars.iloc[split:], forming=True)
+    expected = build_features_ta(bars)[StreamingFeatures.columns].loc[stream.index]
+    np.testing.assert_allclose(stream.to_numpy(), expected.to_numpy(dtype=float), rtol=1e-9, atol=1e-6)
+
+
+def test_required_columns_are_ready_before_all_columns(bars):
+    engine = StreamingFeatures(required=["ret_1", "ret_20"])
+    full = StreamingFeatures()
+    first_ready = first_full = None
+    for i, (ts, (o, h, l, c)) in enumerate(zip(bars.index, bars[OHLC_COLUMNS].to_numpy(dtype=float))):
+        engine.update(ts, o, h, l, c)
+        full.update(ts, o, h, l, c)
+        if first_ready is None and engine.ready:
+            first_ready = i
+        if first_full is None and full.ready:
+            first_full = i
+            break
+    assert first_ready == 20  # ret_20 needs 20 earlier closes
+    assert first_full > first_ready
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from xgboost import XGBClassifier
+
+from models.tree_predictor import FlatForest, check_parity
+
+
+def _data(n, rng):
+    X = rng.normal(size=(n, 6)).astype(np.float32)
+    y = (X[:, 0] > 0.3).astype(int) + (X[:, 1] + X[:, 2] > 0.5).astype(int)
+    # missing values in both classes of rows, so trees learn left and right defaults
+    X[rng.random(X.shape) < 0.15] = np.nan
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(3)
+    X, y = _data(3000, rng)
+    model = XGBClassifier(objective="multi:softprob", num_class=3, n_estimators=40, max_depth=4,
+                          learning_rate=0.3, n_jobs=1)
+    model.fit(X, y)
+    X_test, _ = _data(2000, rng)
+    return model, X_test
+
+
+def test_flat_forest_matches_predict_proba(fitted):
+    model, X = fitted
+    forest = FlatForest.from_model(model)
+    splits = forest.left != np.arange(len(forest.left))
+    # both default branches are taken by the NaN rows below
+    assert forest.default_left[splits].any() and not forest.default_left[splits].all()
+    assert np.isnan(X).any(axis=1).mean() > 0.5
+
+    np.testing.assert_allclose(forest.predict_proba(X), model.predict_proba(X), atol=1e-6, rtol=0)
+    assert check_parity(model, X, atol=1e-6) <= 1e-6
+
+
+def test_all_missing_row_takes_default_branches(fitted):
+    model, _ = fitted
+    X = np.full((1, 6), np.nan, dtype=np.float32)
+    np.testing.assert_allclose(FlatForest.from_model(model).predict_proba(X), model.predict_proba(X), atol=1e-6)
+
+
+def test_early_stopped_model_uses_best_round():
+    rng = np.random.default_rng(5)
+    X, y = _data(3000, rng)
+    X_val, y_val = _data(1000, rng)
+    model = XGBClassifier(objective="multi:softprob", num_class=3, n_estimators=300, max_depth=6,
+                          learning_rate=0.5, early_stopping_rounds=5, eval_metric="mlogloss", n_jobs=1)
+    model.fit(X, y, eval_set=[(X_val, y_val)], verbose=False)
+    assert model.best_iteration + 1 < 300
+
+    forest = FlatForest.from_model(model)
+    assert len(forest.roots) == (model.best_iteration + 1) * 3
+    np.testing.assert_allclose(forest.predict_proba(X_val), model.predict_proba(X_val), atol=1e-6, rtol=0)
@@ -0,0 +1,21 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("matplotlib")  # pipeline.run_full imports the plotting reports
+
+from pipeline.walk_forward import make_folds  # noqa: E402
+
+
+def test_fold_boundaries_stay_on_local_midnight_across_dst():
+    tz = "Europe/Sofia"  # DST ends 2025-10-26
+    folds = make_folds("2025-09-01", "2025-12-31", train_days=30, test_days=14, tz=tz)
+    index = pd.date_range("2025-09-01", "2025-12-31", freq="5min", tz=tz)
+    day_starts = set(index[index.normalize() == index])
+
+    assert any(f["train_start"].utcoffset() != f["test_end"].utcoffset() for f in folds)
+    for fold in folds:
+        for key in ("train_start", "test_start", "test_end"):
+            boundary = fold[key]
+            assert (boundary.hour, boundary.minute) == (0, 0)
+            # a boundary is the first bar of its local day
+            assert index[index.searchsorted(boundary)] in day_starts
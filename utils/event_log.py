@@ -0,0 +1,200 @@
+# utils/event_log.py
+
+import csv
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+from config import settings as cfg
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# fields of every live event type, in column order, per log
+TRADE_EVENTS = {
+    "OPEN_TRADE": ("bar_time", "direction", "confidence", "atr_norm", "sl", "tp", "volume"),
+    "MARGIN_CHECK": ("direction", "required_margin", "long_used", "short_used", "avail_long", "avail_short",
+                     "equity", "free_margin", "margin_level"),
+}
+LOW_CONF_EVENTS = {
+    "NO_TRADE_LOW_CONF": ("bar_time", "confidence"),
+    "NO_TRADE_LOW_ATR": ("bar_time", "atr_norm"),
+    "NO_TRADE_NEUTRAL": ("bar_time",),
+    "CAN_NOT_COMPUTE_MARGIN": ("bar_time",),
+    "TRADE_BLOCKED_MARGIN": ("bar_time", "direction", "required_margin"),
+}
+CLOSED_TRADE_EVENTS = {
+    "CLOSE_TRADE": ("bar_time", "ticket", "profit", "comment"),
+}
+
+
+class CsvEventLog:
+    """
+    One CSV file with a fixed schema: timestamp, event, then the union of
+    the fields of every event type in `schemas` ({event: fields}). A row
+    fills its own event's fields and leaves the others empty, so events
+    with different fields never shift columns. An existing file with another
+    header is moved aside (<name>.<time>.csv) and a new one started.
+    """
+
+    def __init__(self, path: str, schemas: dict):
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self.schemas = {event: tuple(fields) for event, fields in schemas.items()}
+        fields = []
+        for event_fields in self.schemas.values():
+            fields += [f for f in event_fields if f not in fields]
+        self.columns = ["timestamp", "event"] + fields
+        self._index = {name: i for i, name in enumerate(self.columns)}
+        self._file = self._writer = None
+        self._warned = set()
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, "r", newline="", encoding="utf-8") as f:
+                header = next(csv.reader(f), None)
+            if header != self.columns:
+                root, ext = os.path.splitext(self.path)
+                moved = f"{root}.{datetime.now():%Y%m%d-%H%M%S}{ext}"
+                os.replace(self.path, moved)
+                print(f"{self.path}: header differs from the current schema, moved to {moved}")
+        write_header = not os.path.exists(self.path)
+        self._file = open(self.path, "a", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        if write_header:
+            self._writer.writerow(self.columns)
+
+    def _warn(self, event: str, field: str):
+        if (event, field) not in self._warned:
+            self._warned.add((event, field))
+            print(f"{self.path}: field '{field}' is not in the schema of {event}, dropped")
+
+    def row(self, timestamp: str, event: str, fields: dict) -> list:
+        row = [""] * len(self.columns)
+        row[0] = timestamp
+        row[1] = event
+        allowed = self.schemas.get(event, self.columns[2:])
+        for name, value in fields.items():
+            if name in allowed and name in self._index:
+                row[self._index[name]] = value
+            else:
+                self._warn(event, name)
+        return row
+
+    def write(self, rows: list):
+        if self._file is None:
+            self._open()
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = self._writer = None
+
+
+class BackgroundWriter:
+    """
+    Writes CsvEventLog rows from a daemon thread.
+
+    submit() only timestamps the event and puts it on a bounded queue, so
+    the caller never touches the disk; when the queue is full (the disk
+    cannot keep up) the event is counted in `dropped` instead of blocking.
+    The thread drains up to `batch` events at a time and writes them with
+    one call per file, keeping the files open, and appends them to `store`
+    (an EventStore) when given. flush() waits until
+    everything queued so far is on disk; close() flushes and stops the
+    thread.
+    """
+
+    def __init__(self, queue_size: int = cfg.LOG_QUEUE_SIZE, batch: int = cfg.LOG_BATCH, store=None):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.batch = batch
+        self.store = store
+        self.dropped = 0
+        self.logs = set()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+                self._thread.start()
+
+    def submit(self, log: CsvEventLog, event: str, fields: dict):
+        if self._thread is None:
+            self._start()
+        try:
+            self.queue.put_nowait((log, time.time(), event, fields))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            items = [self.queue.get()]
+            while len(items) < self.batch:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            pending = {}
+            events = []
+            markers = []
+            stop = False
+            for item in items:
+                if isinstance(item, threading.Event):  # flush / close marker
+                    markers.append(item)
+                elif item is None:
+                    stop = True
+                else:
+                    log, ts, event, fields = item
+                    timestamp = datetime.fromtimestamp(ts, timezone.utc).strftime(TIMESTAMP_FORMAT)
+                    pending.setdefault(log, []).append(log.row(timestamp, event, fields))
+                    events.append((timestamp, event, log.name, fields))
+            for log, rows in pending.items():
+                self.logs.add(log)
+                try:
+                    log.write(rows)
+                except OSError as e:
+                    # a locked or full disk must not kill the writer
+                    print(f"{log.path}: write failed ({e}), {len(rows)} events lost")
+            if self.store is not None and events:
+                try:
+                    self.store.append_many(events)
+                except Exception as e:  # sqlite3.Error, locked database
+                    print(f"{self.store.path}: append failed ({e}), {len(events)} events not stored")
+            for marker in markers:
+                marker.set()
+            if stop:
+                for log in self.logs:
+                    log.close()
+                if self.store is not None:
+                    self.store.close()
+                return
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until the events submitted so far are written, False on timeout."""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        try:
+            self.queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0):
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            # events queued before the stop marker are still written
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+        if self.dropped:
+            print(f"Event log: {self.dropped} events dropped, the queue was full")
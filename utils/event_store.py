@@ -0,0 +1,209 @@
+# utils/event_store.py
+
+import csv
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from config import settings as cfg
+from utils.event_log import TIMESTAMP_FORMAT, TRADE_EVENTS, LOW_CONF_EVENTS, CLOSED_TRADE_EVENTS
+
+# CSV logs written before the event store existed; margin_log / low_conf_log are
+# logs/scripts.py splits of live_trading.csv, their rows are skipped as duplicates
+LEGACY_LOGS = (
+    "logs/live_trading.csv",
+    "logs/trades_log.csv",
+    "logs/low_conf.csv",
+    "logs/closed_trades_log.csv",
+    "logs/margin_log.csv",
+    "logs/low_conf_log.csv",
+)
+
+EVENT_FIELDS = {**TRADE_EVENTS, **LOW_CONF_EVENTS, **CLOSED_TRADE_EVENTS}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts TEXT NOT NULL,          -- UTC, TIMESTAMP_FORMAT (sorts as text)
+    event TEXT NOT NULL,
+    log TEXT NOT NULL,         -- CSV log the event belongs to (trades_log, low_conf, ...)
+    bar_time TEXT,
+    data TEXT NOT NULL         -- the remaining fields as JSON
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts, event);
+CREATE INDEX IF NOT EXISTS events_event_ts ON events (event, ts);
+CREATE TABLE IF NOT EXISTS imports (
+    path TEXT PRIMARY KEY,
+    rows INTEGER NOT NULL,
+    imported TEXT NOT NULL
+);
+"""
+
+
+def _json_value(value):
+    # numpy scalars (model confidences) and timestamps
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def _parse(value: str):
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _ts(value) -> str:
+    """TIMESTAMP_FORMAT string in UTC of a str/datetime/Timestamp (naive means UTC)."""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return ts.strftime(TIMESTAMP_FORMAT)
+
+
+class EventStore:
+    """
+    Append-only SQLite store (WAL mode) of the live trading events under
+    cfg.EVENT_STORE_PATH.
+
+    One row per event: UTC timestamp, event type, source log and bar time
+    as columns, the other fields as JSON. Indexes on (ts, event) and
+    (event, ts) make a time range or an event type over a time range a
+    range scan, so
+    summaries never read the whole history. WAL lets readers query while
+    the live writer appends. import_csv() loads the CSV logs once.
+    """
+
+    def __init__(self, path: str = cfg.EVENT_STORE_PATH):
+        self.path = path
+        self._conn = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # --- writes ---
+
+    @staticmethod
+    def _rows(events) -> list:
+        rows = []
+        for timestamp, event, log, fields in events:
+            fields = dict(fields)
+            bar_time = fields.pop("bar_time", None)
+            rows.append((timestamp, event, log, None if bar_time is None else str(bar_time),
+                         json.dumps(fields, default=_json_value)))
+        return rows
+
+    def append_many(self, events) -> int:
+        """Append (timestamp, event, log, fields) tuples in one transaction."""
+        rows = self._rows(events)
+        with self.conn:
+            self.conn.executemany("INSERT INTO events (ts, event, log, bar_time, data) VALUES (?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def append(self, event: str, log: str = "", timestamp=None, **fields):
+        timestamp = _ts(timestamp) if timestamp is not None else datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+        self.append_many([(timestamp, event, log, fields)])
+
+    # --- queries ---
+
+    def _where(self, start=None, end=None, events=None, log=None):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(_ts(start))
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(_ts(end))
+        if events:
+            clauses.append(f"event IN ({', '.join('?' * len(events))})")
+            params += list(events)
+        if log:
+            clauses.append("log = ?")
+            params.append(log)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(self, start=None, end=None, events=None, log: str = None) -> pd.DataFrame:
+        """
+        Events with start <= timestamp < end (UTC, either bound optional),
+        optionally only the given event types / log, oldest first. The JSON
+        fields are expanded into columns.
+        """
+        where, params = self._where(start, end, events, log)
+        rows = self.conn.execute(f"SELECT ts, event, log, bar_time, data FROM events{where} ORDER BY ts, id",
+                                 params).fetchall()
+        records = [{"timestamp": ts, "event": event, "log": log_name, "bar_time": bar_time, **json.loads(data)}
+                   for ts, event, log_name, bar_time, data in rows]
+        df = pd.DataFrame.from_records(records, columns=None if records else
+                                       ["timestamp", "event", "log", "bar_time"])
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        return df
+
+    def count_by_event(self, start=None, end=None, log: str = None) -> dict:
+        """{event: count} of the events in [start, end)."""
+        where, params = self._where(start, end, log=log)
+        # "+event": group in a temp b-tree so the planner range-scans (ts, event)
+        # instead of walking the whole (event, ts) index to avoid the sort
+        return dict(self.conn.execute(f"SELECT event, COUNT(*) FROM events{where} GROUP BY +event", params))
+
+    # --- CSV import ---
+
+    def import_csv(self, path: str, force: bool = False) -> int:
+        """
+        Load a CSV log once (recorded in the imports table; force re-imports).
+        Rows whose width matches their event's schema are read by position,
+        which also recovers rows written under another event's header by the
+        old per-event CSV writer; other rows are read by the file's header.
+        Events already stored (same time, type, bar and fields, e.g. from a
+        log the file was split from) are skipped. Returns the number added.
+        """
+        path = os.path.normpath(path)
+        if not os.path.exists(path):
+            return 0
+        if not force and self.conn.execute("SELECT 1 FROM imports WHERE path = ?", (path,)).fetchone():
+            print(f"{path}: already imported")
+            return 0
+
+        log = os.path.splitext(os.path.basename(path))[0]
+        events = []
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, None) or []
+            for row in reader:
+                if len(row) < 2:
+                    continue
+                names = EVENT_FIELDS.get(row[1])
+                if names is None or len(names) != len(row) - 2:
+                    names = [{"trade_time": "bar_time"}.get(n, n) for n in header[2:]]  # old name of bar_time
+                fields = {n: _parse(v) for n, v in zip(names, row[2:]) if v != ""}
+                events.append((_ts(row[0]), row[1], log, fields))
+        if not events:
+            return 0
+
+        rows = self._rows(events)
+        stored = set(self.conn.execute(
+            "SELECT ts, event, bar_time, data FROM events WHERE ts >= ? AND ts <= ?",
+            (min(r[0] for r in rows), max(r[0] for r in rows))))
+        rows = [r for r in rows if (r[0], r[1], r[3], r[4]) not in stored]
+        with self.conn:
+            self.conn.executemany("INSERT INTO events (ts, event, log, bar_time, data) VALUES (?, ?, ?, ?, ?)", rows)
+            self.conn.execute("INSERT OR REPLACE INTO imports (path, rows, imported) VALUES (?, ?, ?)",
+                              (path, len(rows), datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)))
+        print(f"{path}: {len(rows)} events imported, {len(events) - len(rows)} already stored")
+        return len(rows)
+
+    def import_logs(self, paths=LEGACY_LOGS, force: bool = False) -> int:
+        return sum(self.import_csv(path, force=force) for path in paths)
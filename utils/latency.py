@@ -0,0 +1,128 @@
+# utils/latency.py
+
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+import numpy as np
+
+from config import settings as cfg
+
+# histogram bucket upper edges in ms (the last bucket is open-ended)
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("metrics", "name", "t0")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+class LatencyMetrics:
+    """
+    Rolling per-stage latencies for the live loop.
+
+    Wrap a stage in `with metrics.stage("name"):` or record(name, seconds)
+    directly; the last `history` samples per stage give the percentiles and
+    the histogram over BUCKETS_MS. tick() once per bar writes the metrics
+    file every `every` bars, close() writes it and prints a summary. When
+    disabled stage() returns a shared no-op context manager and record()
+    returns at once.
+    """
+
+    def __init__(self, enabled: bool = cfg.LATENCY_METRICS, path: str = cfg.LATENCY_METRICS_PATH,
+                 every: int = cfg.LATENCY_METRICS_EVERY, history: int = 1000):
+        self.enabled = enabled
+        self.path = path
+        self.every = every
+        self.history = history
+        self.samples = {}
+        self.bars = 0
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def record(self, name: str, seconds: float):
+        if not self.enabled:
+            return
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.history)
+        samples.append(seconds)
+
+    def summary(self) -> dict:
+        """Per stage: n, mean, p50, p90, p99 and max in ms plus histogram bucket counts."""
+        out = {}
+        for name, samples in self.samples.items():
+            ms = np.array(samples) * 1000
+            counts = np.bincount(np.searchsorted(BUCKETS_MS, ms), minlength=len(BUCKETS_MS) + 1)
+            out[name] = {
+                "n": len(ms),
+                "mean": float(ms.mean()),
+                "p50": float(np.percentile(ms, 50)),
+                "p90": float(np.percentile(ms, 90)),
+                "p99": float(np.percentile(ms, 99)),
+                "max": float(ms.max()),
+                "histogram": dict(zip([f"<={b}" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"], counts.tolist())),
+            }
+        return out
+
+    def write(self):
+        if not self.enabled or not self.samples:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        payload = {
+            "updated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "bars": self.bars,
+            "stages": self.summary(),
+        }
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(payload, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def tick(self):
+        """Count one bar, writing the metrics file every `every` bars."""
+        if not self.enabled:
+            return
+        self.bars += 1
+        if self.bars % self.every == 0:
+            self.write()
+
+    def close(self):
+        if not self.enabled or not self.samples:
+            return
+        self.write()
+        print(f"\n=== Latency summary ({self.bars} bars, ms) ===")
+        print(f"{'stage':<26}{'n':>7}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+        for name, s in self.summary().items():
+            print(f"{name:<26}{s['n']:>7}{s['mean']:>10.2f}{s['p50']:>10.2f}{s['p90']:>10.2f}"
+                  f"{s['p99']:>10.2f}{s['max']:>10.2f}")
+        print(f"Metrics written to {self.path}")
@@ -1,11 +1,12 @@
 from datetime import datetime
-import MetaTrader5 as mt5
 from config import settings as cfg
 
 from execution.margin import get_long_short_margin
-import csv
-import os
-from datetime import datetime
+from execution.terminal import terminal
+from utils.event_log import (BackgroundWriter, CsvEventLog, TRADE_EVENTS, LOW_CONF_EVENTS,
+                             CLOSED_TRADE_EVENTS)
+from utils.event_store import EventStore
+import atexit
 
 
 def log_event(msg: str):
@@ -17,6 +18,7 @@ def log_event(msg: str):
 
 
 def log_margin_state(prefix: str, direction: int, required_margin: float):
+    mt5 = terminal()
     account = mt5.account_info()
     long_used, short_used = get_long_short_margin()
 
@@ -60,74 +62,39 @@ TRADES_CSV_LOG_PATH = "logs/trades_log.csv"
 LOW_LOGS_CSV_LOG_PATH = "logs/low_conf.csv"
 CLOSED_TRADES_CSV_LOG_PATH = "logs/closed_trades_log.csv"
 
+TRADES_LOG = CsvEventLog(TRADES_CSV_LOG_PATH, TRADE_EVENTS)
+LOW_CONF_LOG = CsvEventLog(LOW_LOGS_CSV_LOG_PATH, LOW_CONF_EVENTS)
+CLOSED_TRADES_LOG = CsvEventLog(CLOSED_TRADES_CSV_LOG_PATH, CLOSED_TRADE_EVENTS)
+
+# one writer thread for all CSV logs (mirrored into the event store); the calls below only enqueue
+CSV_WRITER = BackgroundWriter(store=EventStore() if cfg.EVENT_STORE else None)
+atexit.register(CSV_WRITER.close)
+
 
 def log_csv(event_type: str, **kwargs):
     """
-    event_type: e.g. 'NO_TRADE', 'OPEN', 'BLOCKED', 'MARGIN', etc.
-    kwargs: any additional fields you want to log
+    event_type: e.g. 'OPEN_TRADE', 'MARGIN_CHECK' (see TRADE_EVENTS)
+    kwargs: the event's fields
     """
-
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(TRADES_CSV_LOG_PATH), exist_ok=True)
-
-    # Prepare row
-    ts = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    row = {"timestamp": ts, "event": event_type}
-    row.update(kwargs)
-
-    # Write header if file doesn't exist
-    write_header = not os.path.exists(TRADES_CSV_LOG_PATH)
-
-    with open(TRADES_CSV_LOG_PATH, "a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=row.keys())
-        if write_header:
-            writer.writeheader()
-        writer.writerow(row)
+    CSV_WRITER.submit(TRADES_LOG, event_type, kwargs)
 
 
 def low_conf_log_csv(event_type: str, **kwargs):
     """
-    event_type: e.g. 'NO_TRADE', 'OPEN', 'BLOCKED', 'MARGIN', etc.
-    kwargs: any additional fields you want to log
+    event_type: e.g. 'NO_TRADE_LOW_CONF', 'TRADE_BLOCKED_MARGIN' (see LOW_CONF_EVENTS)
+    kwargs: the event's fields
     """
-
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(LOW_LOGS_CSV_LOG_PATH), exist_ok=True)
-
-    # Prepare row
-    ts = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    row = {"timestamp": ts, "event": event_type}
-    row.update(kwargs)
-
-    # Write header if file doesn't exist
-    write_header = not os.path.exists(LOW_LOGS_CSV_LOG_PATH)
-
-    with open(LOW_LOGS_CSV_LOG_PATH, "a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=row.keys())
-        if write_header:
-            writer.writeheader()
-        writer.writerow(row)
+    CSV_WRITER.submit(LOW_CONF_LOG, event_type, kwargs)
 
 
 def closed_trades_log_csv(event_type: str, **kwargs):
     """
-    event_type: e.g. 'NO_TRADE', 'OPEN', 'BLOCKED', 'MARGIN', etc.
-    kwargs: any additional fields you want to log
+    event_type: e.g. 'CLOSE_TRADE' (see CLOSED_TRADE_EVENTS)
+    kwargs: the event's fields
     """
+    CSV_WRITER.submit(CLOSED_TRADES_LOG, event_type, kwargs)
 
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(CLOSED_TRADES_CSV_LOG_PATH), exist_ok=True)
-
-    # Prepare row
-    ts = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    row = {"timestamp": ts, "event": event_type}
-    row.update(kwargs)
-
-    # Write header if file doesn't exist
-    write_header = not os.path.exists(CLOSED_TRADES_CSV_LOG_PATH)
 
-    with open(CLOSED_TRADES_CSV_LOG_PATH, "a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=row.keys())
-        if write_header:
-            writer.writeheader()
-        writer.writerow(row)
\ No newline at end of file
+def flush_logs(timeout: float = 5.0) -> bool:
+    """Wait until every CSV event logged so far is on disk."""
+    return CSV_WRITER.flush(timeout)
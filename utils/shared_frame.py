@@ -0,0 +1,95 @@
+# utils/shared_frame.py
+
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+class SharedFrame:
+    """
+    A homogeneous-dtype DataFrame published once in shared memory.
+
+    The parent calls SharedFrame.publish(df) and passes .handle (a small
+    picklable dict) to worker processes, which call SharedFrame.attach(handle)
+    to get a read-only DataFrame backed by the same memory: values are a
+    zero-copy view of the shared block, only the index is rebuilt locally.
+    The publisher must keep the object alive and call close() when done.
+    """
+
+    def __init__(self, shm, handle, owner):
+        self.shm = shm
+        self.handle = handle
+        self.owner = owner
+
+    @classmethod
+    def publish(cls, df: pd.DataFrame):
+        values = df.to_numpy()
+        index = df.index.asi8
+        nbytes = max(values.nbytes + index.nbytes, 1)
+        shm = shared_memory.SharedMemory(create=True, size=nbytes)
+
+        # index first, then the values column-major so every column is contiguous
+        np.ndarray(index.shape, dtype=np.int64, buffer=shm.buf)[:] = index
+        np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf, offset=index.nbytes, order="F")[:] = values
+
+        handle = {
+            "name": shm.name,
+            "shape": values.shape,
+            "dtype": values.dtype.str,
+            "columns": list(df.columns),
+            "index_name": df.index.name,
+            "unit": getattr(df.index, "unit", "ns"),
+            "tz": str(df.index.tz) if getattr(df.index, "tz", None) is not None else None,
+            "attrs": dict(df.attrs),
+        }
+        return cls(shm, handle, owner=True)
+
+    @classmethod
+    def attach(cls, handle: dict):
+        shm = shared_memory.SharedMemory(name=handle["name"])
+        return cls(shm, handle, owner=False)
+
+    @property
+    def nbytes(self) -> int:
+        return self.shm.size
+
+    def frame(self) -> pd.DataFrame:
+        h = self.handle
+        n = h["shape"][0]
+        index = np.ndarray((n,), dtype=np.int64, buffer=self.shm.buf)
+        values = np.ndarray(h["shape"], dtype=np.dtype(h["dtype"]), buffer=self.shm.buf,
+                            offset=index.nbytes, order="F")
+        values.flags.writeable = False
+
+        idx = pd.DatetimeIndex(index.view(f"M8[{h['unit']}]"), name=h["index_name"])
+        if h["tz"] is not None:
+            idx = idx.tz_localize("UTC").tz_convert(h["tz"])
+        df = pd.DataFrame(values, index=idx, columns=h["columns"], copy=False)
+        df.attrs.update(h["attrs"])
+        return df
+
+    def shares(self, df: pd.DataFrame) -> bool:
+        """True when every column of df is a view of this block (no private copy)."""
+        base = np.ndarray((self.shm.size,), dtype=np.uint8, buffer=self.shm.buf)
+        return all(np.shares_memory(df[c].to_numpy(), base) for c in df.columns)
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def rss_mb():
+    """Resident memory of this process in MB, None where it cannot be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2 ** 20
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        return None
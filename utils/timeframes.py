@@ -0,0 +1,16 @@
+TIMEFRAME_MINUTES = {
+    "M1": 1,
+    "M5": 5,
+    "M15": 15,
+    "M30": 30,
+    "H1": 60,
+    "H4": 240,
+    "D1": 1440,
+}
+
+
+def timeframe_seconds(timeframe: str) -> int:
+    minutes = TIMEFRAME_MINUTES.get(timeframe)
+    if minutes is None:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return minutes * 60